@@ -0,0 +1,132 @@
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from Benchmarks.synthetic_data import generate_dataset
+
+# --- Ingest Checks ---
+# Runs the cleaning script's full, incremental and streaming modes against a
+# small synthetic raw extract in a scratch data directory and checks the
+# outcomes that have broken before. Prints one line per check and exits
+# non-zero if any fails.
+DEFAULT_ROWS = 20_000
+
+
+def raw_extract(n_rows, seed=0):
+    """Returns a raw-shaped extract: synthetic incidents plus incident/offense ids and raw date strings."""
+    raw = generate_dataset(n_rows, seed=seed)
+    raw.insert(0, "incident_id", np.arange(n_rows))
+    raw.insert(1, "offense_id", np.arange(n_rows) * 10)
+    raw["reported_date"] = raw["reported_date"].dt.strftime("%m/%d/%Y %I:%M:%S %p")
+    return raw
+
+
+def run_checks(data_dir, n_rows):
+    """Runs every check against data_dir and returns a list of (name, passed, detail)."""
+    os.environ["DENVER_TRAFFIC_DATA_DIR"] = data_dir
+    warnings.simplefilter("ignore")
+    import matplotlib
+    matplotlib.use("Agg")
+    from Data import Denver_Traffic_EDA as eda
+    from Data.loader import read_clean_data
+
+    raw_path = os.path.join(data_dir, "raw.csv")
+    delta_path = os.path.join(data_dir, "delta.csv")
+    eda.data_path = raw_path
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    results = []
+
+    # Duplicate raw records and id-less rows
+    raw = raw_extract(n_rows)
+    raw.loc[raw.index[-3:], ["incident_id", "offense_id"]] = np.nan
+    raw = raw.iloc[np.r_[0:n_rows, 0:30]]
+    raw.to_csv(raw_path, index=False)
+    with quiet:
+        eda.run_full_clean()
+    index = eda.read_key_index()
+    results.append(("key index has one row per keyed record", index.index.is_unique and len(index) == n_rows - 3,
+                    f"{len(index):,} keys"))
+    loaded = len(read_clean_data())
+    results.append(("rows without ids are kept apart", loaded == n_rows, f"{loaded:,} rows loaded"))
+
+    # Ingest batches are numbered by the second; keep each run in its own batch
+    time.sleep(1)
+
+    # Unchanged records whose ids are read as floats (written here as 17.0)
+    delta = raw.iloc[100:150].copy()
+    delta[["incident_id", "offense_id"]] = delta[["incident_id", "offense_id"]].astype(np.float64)
+    delta.to_csv(delta_path, index=False)
+    with quiet:
+        changed = eda.run_incremental(delta_path)
+    results.append(("float-typed delta of unchanged rows", changed == 0, f"{changed} new or changed"))
+
+    # The same records with one blank id: only that row is new
+    delta.iloc[0, delta.columns.get_loc("offense_id")] = np.nan
+    delta.to_csv(delta_path, index=False)
+    with quiet:
+        changed = eda.run_incremental(delta_path)
+    loaded = len(read_clean_data())
+    results.append(("delta with one blank id", changed == 1 and loaded == n_rows + 1,
+                    f"{changed} new or changed, {loaded:,} rows loaded"))
+
+    # Streaming clean of the same extract, with a text column that is blank
+    # for the first chunks (pandas would infer those chunks as float)
+    time.sleep(1)
+    raw["TU2_DRIVER_ACTION"] = np.where(np.arange(len(raw)) < 5_000, None, "NO IMPROPER ACTION")
+    raw.to_csv(raw_path, index=False)
+    with quiet:
+        eda.run_streaming_clean(3_000)
+    loaded = len(read_clean_data())
+    results.append(("streaming clean with a sparse text column", loaded == n_rows, f"{loaded:,} rows loaded"))
+
+    time.sleep(1)
+    delta = raw.iloc[100:150]
+    delta.to_csv(delta_path, index=False)
+    with quiet:
+        changed = eda.run_incremental(delta_path)
+    results.append(("unchanged delta after a streaming clean", changed == 0, f"{changed} new or changed"))
+
+    # A chunk that fails to parse must leave the previous outputs intact
+    with open(raw_path, "a") as f:
+        f.write("1,2,3\n" + ",".join(["x"] * (len(raw.columns) + 5)) + "\n")
+    try:
+        with quiet:
+            eda.run_streaming_clean(3_000)
+        failed = False
+    except Exception:
+        failed = True
+    loaded = len(read_clean_data())
+    leftovers = [name for name in os.listdir(data_dir) if name.endswith(".tmp")]
+    results.append(("failed streaming clean keeps the old artifact", failed and loaded == n_rows and not leftovers,
+                    f"{loaded:,} rows loaded, {len(leftovers)} temp outputs left"))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the cleaning script's ingest modes on synthetic data.")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Synthetic raw extract size in rows.")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="denver_ingest_checks_")
+    try:
+        results = run_checks(data_dir, args.rows)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    for name, passed, detail in results:
+        print(f"{'PASS' if passed else 'FAIL'}  {name:<45} {detail}")
+    if not all(passed for _, passed, _ in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Benchmarks.synthetic_data import write_synthetic_dataset
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app.py")
+PAGES = ["Home", "About Me", "EDA Gallery", "Dashboard", "Future Work"]
+
+# --- Simulated Session ---
+# Each session is a headless AppTest with its own session_state. AppTest swaps
+# a process-global mock runtime in and out around every rerun, so sessions in
+# one process must take turns: each worker process interleaves its sessions
+# round-robin (like one busy server worker), and worker processes provide the
+# concurrency. Sessions in the same process share st.cache_data/cache_resource.
+
+
+def timed_run(latencies, action, func):
+    """Performs one interaction and records how long its rerun took."""
+    start = time.perf_counter()
+    func()
+    latencies.append((action, (time.perf_counter() - start) * 1000))
+
+
+def open_page(at, page, latencies):
+    """Opens the sidebar if needed and clicks the page's button."""
+    if not any(b.label == page for b in at.button):
+        timed_run(latencies, "toggle_sidebar", lambda: at.button(key="sidebar_toggle_button").click().run())
+    button = next(b for b in at.button if b.label == page)
+    timed_run(latencies, f"open {page}", lambda: button.click().run())
+
+
+def apply_filters(at):
+    """Submits the Dashboard filter form, which is what triggers the rerun."""
+    next(b for b in at.button if b.label == "Apply Filters").click().run()
+
+
+def session_steps(session_id, actions, timeout, latencies):
+    """
+    Simulates one viewer as a generator that yields after each interaction,
+    recording (action, latency_ms) pairs into latencies.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(session_id)
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    timed_run(latencies, "initial_load", at.run)
+    yield
+
+    full_range = None
+    for _ in range(actions):
+        action = rng.choice(["navigate", "slider", "slider", "neighborhoods"])
+        if action == "navigate" or at.session_state["page"] != "Dashboard":
+            page = rng.choice(PAGES) if action == "navigate" else "Dashboard"
+            open_page(at, page, latencies)
+        elif action == "slider":
+            slider = at.slider[0]
+            full_range = full_range or slider.value
+            span_days = (full_range[1] - full_range[0]).days
+            length = rng.randint(7, span_days)
+            start = full_range[0] + timedelta(days=rng.randint(0, span_days - length))
+            slider.set_value((start, start + timedelta(days=length)))
+            timed_run(latencies, "apply_date_range", lambda: apply_filters(at))
+        else:
+            multiselect = at.multiselect[0]
+            choice = rng.sample(list(multiselect.options), rng.randint(1, min(12, len(multiselect.options))))
+            multiselect.set_value(choice)
+            timed_run(latencies, "apply_neighborhoods", lambda: apply_filters(at))
+
+        if at.exception:
+            raise RuntimeError(f"Session {session_id}: {at.exception[0].value}")
+        yield
+
+
+def run_worker(session_ids, actions, timeout, data_dir):
+    """
+    Runs a group of sessions round-robin in this process.
+    Returns their latency records and this process's peak RSS in MB.
+    """
+    # Must be set before the app imports Data.loader
+    os.environ["DENVER_TRAFFIC_DATA_DIR"] = data_dir
+    warnings.simplefilter("ignore")
+
+    latencies = []
+    sessions = [session_steps(i, actions, timeout, latencies) for i in session_ids]
+    while sessions:
+        for session in list(sessions):
+            try:
+                next(session)
+            except StopIteration:
+                sessions.remove(session)
+    # ru_maxrss is reported in kilobytes on Linux
+    return latencies, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# --- Report ---
+def percentiles(values):
+    values = np.asarray(values)
+    return {
+        "count": int(values.size),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent Streamlit sessions against a synthetic dataset.")
+    parser.add_argument("--sessions", type=int, default=8, help="Number of concurrent simulated sessions.")
+    parser.add_argument("--actions", type=int, default=20, help="Interactions per session.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic dataset size in rows.")
+    parser.add_argument("--processes", type=int, help="Worker processes (default: one per CPU, at most one per session).")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-rerun timeout in seconds.")
+    parser.add_argument("--data-root", default=os.path.join(tempfile.gettempdir(), "denver_benchmarks"),
+                        help="Where synthetic datasets are generated and reused.")
+    parser.add_argument("--output", help="Optional path for a JSON report.")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    data_dir = os.path.join(args.data_root, f"rows_{args.rows}")
+    write_synthetic_dataset(args.rows, data_dir)
+
+    processes = max(1, min(args.processes or os.cpu_count() or 1, args.sessions))
+    groups = [list(range(args.sessions))[i::processes] for i in range(processes)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = list(pool.map(run_worker, groups, [args.actions] * processes,
+                                [args.timeout] * processes, [data_dir] * processes))
+    elapsed = time.perf_counter() - start
+
+    records = [record for latencies, _ in results for record in latencies]
+    peak_rss = [rss for _, rss in results]
+    by_action = {}
+    for action, ms in records:
+        by_action.setdefault(action, []).append(ms)
+
+    report = {
+        "sessions": args.sessions,
+        "processes": processes,
+        "actions_per_session": args.actions,
+        "rows": args.rows,
+        "elapsed_s": elapsed,
+        "reruns_per_s": len(records) / elapsed,
+        "peak_rss_mb_per_process": max(peak_rss),
+        "peak_rss_mb_total": sum(peak_rss),
+        "overall": percentiles([ms for _, ms in records]),
+        "by_action": {action: percentiles(values) for action, values in sorted(by_action.items())},
+    }
+
+    print(f"{args.sessions} sessions x {args.actions} actions on {args.rows:,} rows "
+          f"across {processes} processes in {elapsed:.1f} s")
+    print(f"Peak process memory: {max(peak_rss):.0f} MB per process, {sum(peak_rss):.0f} MB total")
+    print(f"{'action':<28}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for action, stats in [("overall", report["overall"])] + list(report["by_action"].items()):
+        print(f"{action:<28}{stats['count']:>7}{stats['p50_ms']:>9.0f}ms{stats['p95_ms']:>8.0f}ms{stats['p99_ms']:>8.0f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
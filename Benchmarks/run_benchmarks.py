@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+DEFAULT_SIZES = [15_000, 1_000_000, 10_000_000]
+
+
+def time_call(func, repeat):
+    """Runs func `repeat` times and returns timing stats in milliseconds."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append((time.perf_counter() - start) * 1000)
+    runs.sort()
+    return {"min_ms": runs[0], "median_ms": runs[len(runs) // 2], "runs": len(runs)}
+
+
+# --- Worker: one dataset size, fresh process ---
+def run_worker(repeat):
+    """
+    Times loading, Dashboard filtering and EDA chart construction against the
+    dataset in DENVER_TRAFFIC_DATA_DIR. Runs in its own process so the first
+    load is genuinely cold. Prints the results as JSON.
+    """
+    warnings.simplefilter("ignore")
+    import numpy as np
+    import pandas as pd
+    from Data import loader
+    from Data.aggregates import (build_daily_cube, query_cube, compute_aggregates, build_aggregates,
+                                 daily_series, rollup_series, TIME_GRANULARITIES)
+    from Data.row_index import build_row_index, filter_rows
+    from Data.map_bins import grid_layout
+    from Data.spatial_index import build_spatial_index, radius_positions
+    from Data.hotspots import find_hotspots
+    from Pages import EDA_Gallery
+
+    results = {}
+
+    # Loading
+    start = time.perf_counter()
+    df = loader.load_dataset()
+    results["cold_load_cached_loader"] = {"min_ms": (time.perf_counter() - start) * 1000, "runs": 1}
+    results["warm_cache_hit"] = time_call(loader.load_dataset, repeat)
+    results["read_csv"] = time_call(lambda: loader.read_clean_data(parquet_path=""), 1)
+    if loader.parquet_available():
+        results["read_parquet"] = time_call(loader.read_clean_data, repeat)
+
+    # Dashboard: default view (first five neighborhoods, full range) and a narrow window
+    cube = build_daily_cube(df)
+    row_index = build_row_index(df)
+    results["build_daily_cube"] = time_call(lambda: build_daily_cube(df), 1)
+    results["build_row_index"] = time_call(lambda: build_row_index(df), 1)
+    neighborhoods = sorted(df["neighborhood_id"].dropna().unique())[:5]
+    first_day = df["reported_date"].iloc[0].normalize()
+    last_day = df["reported_date"].iloc[-1].normalize()
+    views = {
+        "full_range": (first_day, last_day),
+        "four_weeks": (last_day - pd.Timedelta(weeks=4), last_day),
+    }
+    for view, (start_date, end_date) in views.items():
+        def kpis():
+            window = query_cube(cube, start_date, end_date, neighborhoods)
+            total = window["incidents"].sum()
+            window["serious_injuries"].sum() / max(total, 1)
+            window["fatalities"].sum()
+            window.groupby("LIGHT_CONDITION", observed=True)["incidents"].sum()
+
+        def baseline_mask():
+            end = end_date + pd.Timedelta(days=1)
+            df[(df["reported_date"] >= start_date) & (df["reported_date"] < end)
+               & df["neighborhood_id"].isin(neighborhoods)]
+
+        def map_points():
+            rows = filter_rows(df, row_index, start_date, end_date, neighborhoods)
+            points = rows[["geo_lat", "geo_lon"]].dropna()
+            grid_layout(points["geo_lat"].to_numpy(), points["geo_lon"].to_numpy())
+
+        def hotspots():
+            rows = filter_rows(df, row_index, start_date, end_date, neighborhoods).dropna(subset=["geo_lat", "geo_lon"])
+            find_hotspots(rows["geo_lat"].to_numpy(dtype=np.float64), rows["geo_lon"].to_numpy(dtype=np.float64),
+                          rows["SERIOUSLY_INJURED"].to_numpy(), rows["FATALITIES"].to_numpy())
+
+        results[f"dashboard_kpis_{view}"] = time_call(kpis, repeat)
+        results[f"dashboard_baseline_mask_{view}"] = time_call(baseline_mask, repeat)
+        results[f"dashboard_map_{view}"] = time_call(map_points, repeat)
+        results[f"dashboard_hotspots_{view}"] = time_call(hotspots, repeat)
+
+    # Dashboard location filter: 500 m around downtown, index vs full scan
+    spatial_index = build_spatial_index(df)
+    results["build_spatial_index"] = time_call(lambda: build_spatial_index(df), 1)
+    center_lat, center_lon, meters = 39.7400, -104.9874, 500
+
+    def radius_scan():
+        lat = np.radians(df["geo_lat"].to_numpy(dtype=np.float64))
+        lon = np.radians(df["geo_lon"].to_numpy(dtype=np.float64))
+        lat0, lon0 = np.radians(center_lat), np.radians(center_lon)
+        h = np.sin((lat - lat0) / 2) ** 2 + np.cos(lat0) * np.cos(lat) * np.sin((lon - lon0) / 2) ** 2
+        np.flatnonzero(2 * 6_371_000 * np.arcsin(np.sqrt(h)) <= meters)
+
+    results["dashboard_radius_index"] = time_call(
+        lambda: radius_positions(spatial_index, center_lat, center_lon, meters), repeat)
+    results["dashboard_radius_scan"] = time_call(radius_scan, repeat)
+
+    # Chart aggregates: in-process from the frame, then per partition across a process pool
+    results["aggregates_from_frame"] = time_call(lambda: compute_aggregates(df), repeat)
+    if loader.parquet_available():
+        results["aggregates_parallel"] = time_call(lambda: build_aggregates(workers=os.cpu_count() or 1), repeat)
+    aggregates = compute_aggregates(df)
+
+    # EDA time series: every granularity with a rolling average, from the daily counts
+    def time_series_rollups():
+        series = daily_series(aggregates["daily"], neighborhoods=neighborhoods)
+        for granularity in TIME_GRANULARITIES:
+            rollup_series(series, granularity, window=3)
+
+    results["eda_time_series_rollups"] = time_call(time_series_rollups, repeat)
+
+    # EDA Gallery chart builders, bypassing the figure cache
+    for name in ["neighborhood_figure", "incidents_over_time_figure",
+                 "type_distribution_figure", "incident_hour_by_day_figure"]:
+        builder = getattr(EDA_Gallery, name).__wrapped__
+        results[f"eda_{name}"] = time_call(lambda: builder(aggregates, "benchmark"), repeat)
+
+    results["rows"] = len(df)
+    print(json.dumps(results))
+
+
+# --- Driver ---
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=BENCHMARK_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark data loading, filtering and chart construction.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Synthetic dataset sizes in rows.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timed operation.")
+    parser.add_argument("--data-root", default=os.path.join(tempfile.gettempdir(), "denver_benchmarks"),
+                        help="Where synthetic datasets are generated and reused.")
+    parser.add_argument("--output", help="Results JSON path (default: Benchmarks/results/<commit>-<time>.json).")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.repeat)
+        return
+
+    from Benchmarks.synthetic_data import write_synthetic_dataset
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": {},
+    }
+    for size in args.sizes:
+        data_dir = os.path.join(args.data_root, f"rows_{size}")
+        print(f"Preparing {size:,} rows in {data_dir} ...")
+        write_synthetic_dataset(size, data_dir)
+        env = dict(os.environ, DENVER_TRAFFIC_DATA_DIR=data_dir)
+        output = subprocess.run(
+            [sys.executable, "-m", "Benchmarks.run_benchmarks", "--worker", "--repeat", str(args.repeat)],
+            cwd=os.path.join(BENCHMARK_DIR, ".."), env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        report["sizes"][str(size)] = json.loads(output.strip().splitlines()[-1])
+        for name, stats in report["sizes"][str(size)].items():
+            if isinstance(stats, dict):
+                print(f"  {name:<45} {stats['min_ms']:>10.1f} ms")
+
+    output_path = args.output or os.path.join(
+        RESULTS_DIR, f"{commit}-{datetime.now().strftime('%Y%m%d%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Data.loader import write_parquet_artifact
+
+# --- Denver-Shaped Synthetic Data ---
+# Mirrors the columns the pages read from Denver_Traffic_Clean.csv, with
+# roughly realistic skew: a few busy neighborhoods, mostly plain accidents,
+# rush-hour peaks and rare serious injuries/fatalities.
+NEIGHBORHOODS = [f"neighborhood-{i:02d}" for i in range(78)]
+OFFENSES = ["TRAF - ACCIDENT", "TRAF - ACCIDENT - HIT & RUN", "TRAF - ACCIDENT - DUI/DUID",
+            "TRAF - ACCIDENT - POLICE", "TRAF - ACCIDENT - SBI", "TRAF - ACCIDENT - FATAL"]
+OFFENSE_WEIGHTS = [0.62, 0.28, 0.05, 0.03, 0.015, 0.005]
+LIGHT_CONDITIONS = ["DAY LIGHT", "DARK-LIGHTED", "DARK-UNLIGHTED", "DAWN OR DUSK"]
+LIGHT_WEIGHTS = [0.68, 0.22, 0.04, 0.06]
+HOUR_WEIGHTS = np.array([2, 1.5, 1.5, 1, 1, 1.5, 3, 5, 6, 4, 4, 5, 6, 6, 6, 7, 8, 8, 6, 4, 3.5, 3, 2.5, 2])
+DENVER_CENTER = (39.7392, -104.9903)
+
+
+def generate_dataset(n_rows, seed=0, start="2013-01-01", years=10):
+    """Generates a clean Denver-shaped incident frame with n_rows rows."""
+    rng = np.random.default_rng(seed)
+    neighborhood_weights = rng.pareto(1.5, len(NEIGHBORHOODS)) + 1
+    neighborhood_weights /= neighborhood_weights.sum()
+
+    days = rng.integers(0, years * 365, n_rows)
+    hours = rng.choice(24, n_rows, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    minutes = rng.integers(0, 60, n_rows)
+    reported = (
+        pd.Timestamp(start)
+        + pd.to_timedelta(days, unit="D")
+        + pd.to_timedelta(hours, unit="h")
+        + pd.to_timedelta(minutes, unit="m")
+    )
+
+    neighborhood = rng.choice(len(NEIGHBORHOODS), n_rows, p=neighborhood_weights)
+    # Each neighborhood clusters around its own center
+    centers = rng.normal(0, 0.05, (len(NEIGHBORHOODS), 2))
+    lat = DENVER_CENTER[0] + centers[neighborhood, 0] + rng.normal(0, 0.008, n_rows)
+    lon = DENVER_CENTER[1] + centers[neighborhood, 1] + rng.normal(0, 0.008, n_rows)
+    missing = rng.random(n_rows) < 0.01
+    lat[missing] = np.nan
+    lon[missing] = np.nan
+
+    return pd.DataFrame({
+        "top_traffic_accident_offense": rng.choice(OFFENSES, n_rows, p=OFFENSE_WEIGHTS),
+        "reported_date": reported,
+        "geo_lon": lon,
+        "geo_lat": lat,
+        "neighborhood_id": np.array(NEIGHBORHOODS)[neighborhood],
+        "LIGHT_CONDITION": rng.choice(LIGHT_CONDITIONS, n_rows, p=LIGHT_WEIGHTS),
+        "SERIOUSLY_INJURED": rng.poisson(0.05, n_rows),
+        "FATALITIES": rng.poisson(0.003, n_rows),
+    })
+
+
+def write_synthetic_dataset(n_rows, directory, seed=0):
+    """
+    Writes Denver_Traffic_Clean.csv and the Parquet artifact for n_rows rows
+    into directory, reusing files from an earlier run with the same size.
+    """
+    os.makedirs(directory, exist_ok=True)
+    csv_path = os.path.join(directory, "Denver_Traffic_Clean.csv")
+    parquet_path = os.path.join(directory, "Denver_Traffic_Clean.parquet")
+    if os.path.exists(csv_path):
+        return csv_path, parquet_path
+    df = generate_dataset(n_rows, seed=seed)
+    write_parquet_artifact(df, batch=0, path=parquet_path)
+    df.to_csv(csv_path, index=False)
+    return csv_path, parquet_path
@@ -2,37 +2,367 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+import argparse
 import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Data.loader import (write_parquet_artifact, append_parquet_artifact, close_parquet_writers, dataset_version,
+                         CLEAN_CSV_PATH, CLEAN_PARQUET_PATH, DATA_DIR, UNKEYED_RECORD, FLOAT_COLUMNS, COUNT_COLUMNS)
+from Data.aggregates import build_aggregates, write_aggregates
+from Data.weather import find_weather_file, read_weather, enrich_with_weather
 
 base_path = os.path.dirname(__file__)
 project_root = os.path.join(base_path, "..")
 data_path = os.path.join(project_root, "Assets", "Denver_Traffic_Accidents.csv")
-df = pd.read_csv(data_path)
-
-# Check prints
-print(df.info(), "\n")
-print(df.head(), "\n")
-
-# Drop unnecessary columns
-df = df.drop(columns=["incident_id", "offense_id", "offense_code_extension", "first_occurrence_date", "last_occurrence_date",
-                  "geo_x", "geo_y", "precinct_id", "ROAD_DESCRIPTION", "ROAD_CONTOUR", "TU1_VEHICLE_MOVEMENT",
-                  "TU2_VEHICLE_MOVEMENT", "FATALITY_MODE_1", "TU1_PEDESTRIAN_ACTION", "TU2_PEDESTRIAN_ACTION",
-                  "FATALITY_MODE_2", "SERIOUSLY_INJURED_MODE_1", "SERIOUSLY_INJURED_MODE_2", "POINT_X", "POINT_Y",
-                  "x", "y"], errors="ignore")
-print(df.head())
-
-# Missing values heatmap
-fig, ax, = plt.subplots(figsize=(15, 8))
-sns.heatmap(df.isnull(), cbar=False, cmap='viridis', ax=ax)
-ax.set_title("Missing Values Heatmap")
-ax.set_xlabel("Columns")
-ax.set_ylabel("Rows")
-plt.show()
-
-# Check for duplicate rows
-print("Duplicates: \n")
-print(df[df.duplicated()])
-
-# Save to new file
-clean_data_path = os.path.join(project_root, "Data", "Denver_Traffic_Clean.csv")
-df.to_csv(clean_data_path, index=False)
\ No newline at end of file
+key_index_path = os.path.join(DATA_DIR, "Denver_Traffic_Keys.parquet")
+
+# Columns that identify one incident/offense record in the raw extract
+KEY_COLUMNS = ["incident_id", "offense_id"]
+
+DROP_COLUMNS = ["incident_id", "offense_id", "offense_code_extension", "first_occurrence_date", "last_occurrence_date",
+                "geo_x", "geo_y", "precinct_id", "ROAD_DESCRIPTION", "ROAD_CONTOUR", "TU1_VEHICLE_MOVEMENT",
+                "TU2_VEHICLE_MOVEMENT", "FATALITY_MODE_1", "TU1_PEDESTRIAN_ACTION", "TU2_PEDESTRIAN_ACTION",
+                "FATALITY_MODE_2", "SERIOUSLY_INJURED_MODE_1", "SERIOUSLY_INJURED_MODE_2", "POINT_X", "POINT_Y",
+                "x", "y"]
+
+
+# Read as numbers; every other raw column is read as text
+RAW_NUMERIC_COLUMNS = KEY_COLUMNS + FLOAT_COLUMNS + COUNT_COLUMNS
+
+
+# --- Raw Extract ---
+def typed_raw(raw_df):
+    """Converts the known numeric columns of raw text rows to numbers (unparsable values become NaN)."""
+    for col in RAW_NUMERIC_COLUMNS:
+        if col in raw_df.columns:
+            raw_df[col] = pd.to_numeric(raw_df[col], errors="coerce")
+    return raw_df
+
+
+def read_raw(path, chunksize=None):
+    """
+    Reads a raw extract (or, with chunksize, an iterator of chunks) with dtypes
+    that don't depend on the values: text columns stay text even when they are
+    blank in a chunk, which would otherwise be inferred as float. Full, chunked
+    and incremental runs therefore hash the same rows the same way.
+    """
+    if chunksize is None:
+        return typed_raw(pd.read_csv(path, dtype=str))
+    return (typed_raw(chunk) for chunk in pd.read_csv(path, dtype=str, chunksize=chunksize))
+
+
+# --- Record Keys ---
+def canonical_ids(values):
+    """
+    Converts an id column to strings that don't depend on the inferred dtype:
+    a blank id makes pandas read the whole column as float, and 17.0 must
+    still give the same key as 17.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        numbers = values.astype("Float64")
+        if (numbers.dropna() % 1 == 0).all():
+            numbers = numbers.astype("Int64")
+        values = numbers
+    return values.astype("string")
+
+
+def record_keys(raw_df):
+    """
+    Hashes the incident/offense id columns into one uint64 key per raw row.
+    Rows with no id at all can't be matched across extracts and get
+    UNKEYED_RECORD, so they are never treated as versions of one record.
+    """
+    ids = pd.DataFrame({col: canonical_ids(raw_df[col]) for col in KEY_COLUMNS})
+    keys = pd.util.hash_pandas_object(ids, index=False).to_numpy().copy()
+    keys[ids.isna().all(axis=1).to_numpy()] = UNKEYED_RECORD
+    return keys
+
+
+def row_hashes(clean_df):
+    """
+    Hashes the cleaned row contents so changed records can be detected.
+    Numeric columns are hashed as float64: one blank value makes pandas infer
+    floats instead of ints for an extract, which must not change the hash of
+    every other row in it.
+    """
+    normalized = pd.DataFrame({
+        col: values.astype(np.float64) if pd.api.types.is_numeric_dtype(values) else values
+        for col, values in clean_df.items()
+    })
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def latest_rows(keys):
+    """Marks the last row of each record key (and every unkeyed row), matching how the loader resolves duplicates."""
+    return ~pd.Series(keys).duplicated(keep="last").to_numpy() | (keys == UNKEYED_RECORD)
+
+
+def latest_keys(keys, hashes):
+    """Keeps the last row hash of each keyed record; unkeyed rows have nothing to match later."""
+    latest = latest_rows(keys) & (keys != UNKEYED_RECORD)
+    return keys[latest], hashes[latest]
+
+
+def write_key_index(keys, hashes, path=key_index_path):
+    """Persists the record key -> row hash index used by incremental ingest (one row per key)."""
+    keys, hashes = latest_keys(keys, hashes)
+    pd.DataFrame({"record_key": keys, "row_hash": hashes}).to_parquet(path, index=False)
+
+
+def read_key_index(path=key_index_path):
+    """Reads the persisted key index, or an empty one if none exists yet."""
+    if not os.path.exists(path):
+        return pd.Series(dtype=np.uint64, name="row_hash")
+    index = pd.read_parquet(path)
+    # Indexes streamed chunk by chunk (or written before keys were deduplicated)
+    # can repeat a key; the last entry is the current one
+    index = index.drop_duplicates(subset="record_key", keep="last")
+    index = index[index["record_key"] != UNKEYED_RECORD]
+    return index.set_index("record_key")["row_hash"]
+
+
+def remove_outputs(paths):
+    """Deletes output files or directories that exist."""
+    for path in paths:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+# --- Weather ---
+def load_weather(path=None):
+    """Reads the hourly weather file if one is available, else returns None."""
+    path = find_weather_file(path)
+    if path is None:
+        print("No weather file found; skipping weather enrichment.")
+        return None
+    weather = read_weather(path)
+    print(f"Weather enrichment: {len(weather):,} hourly observations from {path}")
+    return weather
+
+
+def add_weather(clean_df, weather):
+    """Joins the nearest weather observation onto each row when weather data is available."""
+    if weather is None:
+        return clean_df
+    return enrich_with_weather(clean_df, weather)
+
+
+# --- Chart Aggregates ---
+def run_build_aggregates(workers):
+    """Rebuilds the EDA Gallery aggregates from the Parquet artifact, spreading its row groups over the workers."""
+    start = time.perf_counter()
+    aggregates = build_aggregates(workers=workers)
+    if aggregates is None:
+        print("No Parquet artifact found; run a full clean first.")
+        return
+    write_aggregates(aggregates, dataset_version())
+    print(f"Chart aggregates built with {workers} worker(s) in {time.perf_counter() - start:.1f} s")
+
+
+# --- Full Clean ---
+def run_full_clean(weather=None):
+    batch = int(datetime.now().strftime("%Y%m%d%H%M%S"))
+    df = read_raw(data_path)
+
+    # Check prints
+    print(df.info(), "\n")
+    print(df.head(), "\n")
+
+    # Keep the record keys before the id columns are dropped
+    keys = record_keys(df)
+
+    # Drop unnecessary columns
+    df = df.drop(columns=DROP_COLUMNS, errors="ignore")
+    print(df.head())
+
+    # Missing values heatmap
+    fig, ax, = plt.subplots(figsize=(15, 8))
+    sns.heatmap(df.isnull(), cbar=False, cmap='viridis', ax=ax)
+    ax.set_title("Missing Values Heatmap")
+    ax.set_xlabel("Columns")
+    ax.set_ylabel("Rows")
+    plt.show()
+
+    # Check for duplicate rows
+    print("Duplicates: \n")
+    print(df[df.duplicated()])
+
+    hashes = row_hashes(df)
+    df = add_weather(df, weather)
+    df["record_key"] = keys
+    df["ingest_batch"] = batch
+
+    # Save to new file
+    df.to_csv(CLEAN_CSV_PATH, index=False)
+
+    # Save the typed, columnar artifact the app loads first
+    write_parquet_artifact(df, batch)
+    write_key_index(keys, hashes)
+
+
+# --- Streaming Clean ---
+def run_streaming_clean(chunksize, weather=None):
+    """
+    Cleans the raw file in chunks for extracts that don't fit in memory.
+    Columns are dropped per chunk, missing-value counts are accumulated
+    incrementally, duplicates are detected against a sorted array of 8-byte
+    row hashes, and the CSV, Parquet artifact (one open file per year) and key
+    index are written as each chunk is done. The outputs are written next to
+    the current ones and only replace them once every chunk succeeded.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    batch = int(datetime.now().strftime("%Y%m%d%H%M%S"))
+    null_counts = None
+    total_rows = 0
+    duplicate_rows = 0
+    seen_rows = np.array([], dtype=np.uint64)
+    key_writer = None
+    year_writers = {}
+    outputs = {path: f"{path}.tmp" for path in (CLEAN_CSV_PATH, CLEAN_PARQUET_PATH, key_index_path)}
+    remove_outputs(outputs.values())
+
+    try:
+        try:
+            for chunk_number, chunk in enumerate(read_raw(data_path, chunksize=chunksize)):
+                if chunk_number == 0:
+                    print(chunk.head(), "\n")
+
+                # Keep the record keys before the id columns are dropped
+                keys = record_keys(chunk)
+                chunk = chunk.drop(columns=DROP_COLUMNS, errors="ignore")
+
+                # Missing values, accumulated per column instead of a full boolean matrix
+                counts = chunk.isnull().sum()
+                null_counts = counts if null_counts is None else null_counts.add(counts, fill_value=0)
+                total_rows += len(chunk)
+
+                # Duplicates against every earlier row (a sorted uint64 array costs 8
+                # bytes per distinct row) and against earlier rows of this chunk
+                hashes = row_hashes(chunk)
+                chunk_unique, first_positions = np.unique(hashes, return_index=True)
+                slots = np.searchsorted(seen_rows, chunk_unique)
+                seen_before = seen_rows[np.minimum(slots, len(seen_rows) - 1)] == chunk_unique if len(seen_rows) else \
+                    np.zeros(len(chunk_unique), dtype=bool)
+                is_duplicate = np.ones(len(chunk), dtype=bool)
+                is_duplicate[first_positions[~seen_before]] = False
+                seen_rows = np.insert(seen_rows, slots[~seen_before], chunk_unique[~seen_before])
+                if is_duplicate.any():
+                    duplicate_rows += int(is_duplicate.sum())
+                    print(chunk[is_duplicate])
+
+                chunk = add_weather(chunk, weather).assign(record_key=keys, ingest_batch=batch)
+                first = chunk_number == 0
+                chunk.to_csv(outputs[CLEAN_CSV_PATH], mode="w" if first else "a", header=first, index=False)
+                append_parquet_artifact(year_writers, chunk, batch, path=outputs[CLEAN_PARQUET_PATH])
+
+                keys, hashes = latest_keys(keys, hashes)
+                key_table = pa.table({"record_key": pa.array(keys, pa.uint64()),
+                                      "row_hash": pa.array(hashes, pa.uint64())})
+                if key_writer is None:
+                    key_writer = pq.ParquetWriter(outputs[key_index_path], key_table.schema)
+                key_writer.write_table(key_table)
+                print(f"Chunk {chunk_number}: {total_rows:,} rows processed")
+        finally:
+            close_parquet_writers(year_writers)
+            if key_writer is not None:
+                key_writer.close()
+    except BaseException:
+        # Leave the previous outputs in place rather than a partial artifact
+        remove_outputs(outputs.values())
+        raise
+
+    for path, temp_path in outputs.items():
+        if os.path.exists(temp_path):
+            remove_outputs([path])
+            os.replace(temp_path, path)
+
+    print(f"Duplicates: {duplicate_rows:,} of {total_rows:,} rows\n")
+
+    # Missing values per column (a heatmap of every row doesn't fit in memory)
+    missing_share = (null_counts / max(total_rows, 1) * 100).sort_values()
+    fig, ax = plt.subplots(figsize=(15, 8))
+    missing_share.plot.barh(ax=ax, color="#440154")
+    ax.set_title("Missing Values by Column")
+    ax.set_xlabel("Missing (%)")
+    ax.set_ylabel("Columns")
+    plt.show()
+
+
+# --- Incremental Ingest ---
+def run_incremental(new_rows_path, weather=None):
+    """
+    Appends only new or changed incident rows from a delta extract.
+    Rows are deduplicated against the persisted key index, so the cost scales
+    with the size of the delta rather than the full history. Returns the
+    number of new or changed rows appended.
+    """
+    if not os.path.exists(CLEAN_CSV_PATH) or not os.path.exists(key_index_path):
+        print("No existing clean data or key index found; run a full clean first.")
+        return 0
+
+    batch = int(datetime.now().strftime("%Y%m%d%H%M%S"))
+    delta = read_raw(new_rows_path)
+    keys = record_keys(delta)
+    delta = delta.drop(columns=DROP_COLUMNS, errors="ignore")
+    hashes = row_hashes(delta)
+
+    # Keep the last version of each record within the delta itself
+    latest = latest_rows(keys)
+    delta, keys, hashes = delta[latest], keys[latest], hashes[latest]
+
+    # New keys, or known keys whose contents changed
+    index = read_key_index().astype("UInt64")
+    known_hashes = index.reindex(keys)
+    is_changed = (known_hashes.isna() | (known_hashes != hashes)).fillna(True).to_numpy(dtype=bool)
+    delta, keys, hashes = delta[is_changed], keys[is_changed], hashes[is_changed]
+    print(f"Incremental ingest: {is_changed.sum()} new or changed rows, {(~is_changed).sum()} unchanged.")
+    if delta.empty:
+        return 0
+
+    delta = add_weather(delta, weather).assign(record_key=keys, ingest_batch=batch)
+
+    # Append in the existing CSV column order
+    csv_columns = pd.read_csv(CLEAN_CSV_PATH, nrows=0).columns
+    delta.reindex(columns=csv_columns).to_csv(CLEAN_CSV_PATH, mode="a", header=False, index=False)
+    write_parquet_artifact(delta, batch, replace=False)
+
+    index = pd.concat([index[~index.index.isin(keys)], pd.Series(hashes, index=keys, dtype="UInt64")])
+    write_key_index(index.index.to_numpy(dtype=np.uint64), index.to_numpy(dtype=np.uint64))
+    return len(delta)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean the Denver traffic accident data.")
+    parser.add_argument("--incremental", metavar="NEW_ROWS_CSV",
+                        help="Append only new or changed rows from this delta extract.")
+    parser.add_argument("--chunksize", type=int,
+                        help="Stream the raw file in chunks of this many rows (for files larger than RAM).")
+    parser.add_argument("--weather", metavar="WEATHER_FILE",
+                        help="Hourly weather CSV/Parquet to join onto incidents "
+                             "(default: Assets/Denver_Weather_Hourly.parquet or .csv if present).")
+    parser.add_argument("--build-aggregates", action="store_true",
+                        help="Only rebuild the precomputed chart aggregates from the existing Parquet artifact.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes used to build the chart aggregates (default: all cores).")
+    args = parser.parse_args()
+
+    if args.build_aggregates:
+        run_build_aggregates(args.workers)
+    elif args.incremental:
+        # Stale aggregates are ignored by the app until they are rebuilt
+        run_incremental(args.incremental, load_weather(args.weather))
+    elif args.chunksize:
+        run_streaming_clean(args.chunksize, load_weather(args.weather))
+        run_build_aggregates(args.workers)
+    else:
+        run_full_clean(load_weather(args.weather))
+        run_build_aggregates(args.workers)
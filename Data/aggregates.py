@@ -0,0 +1,388 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor
+from Data.loader import (load_dataset, dataset_version, encode_category, category_counts, latest_record_mask,
+                         CLEAN_PARQUET_PATH, DATA_DIR, RECORD_COLUMNS, WEATHER_CATEGORY_COLUMNS)
+from Utils.profiling import track_cache, note_cache_miss
+
+# --- Daily Aggregate Cube ---
+# One row per day x neighborhood x light condition (x weather condition when
+# the data was enriched), so Dashboard range queries scan a few thousand cube
+# rows instead of every incident.
+CUBE_DIMENSIONS = ["neighborhood_id", "LIGHT_CONDITION"]
+
+
+def build_daily_cube(df):
+    """
+    Aggregates incidents into daily counts, serious injury sums and fatality
+    sums by neighborhood and light condition, sorted by day.
+    """
+    day = df["reported_date"].dt.normalize().rename("day")
+    dimensions = CUBE_DIMENSIONS + [col for col in WEATHER_CATEGORY_COLUMNS if col in df.columns]
+    cube = (
+        df.groupby([day] + dimensions, observed=True, dropna=False)
+        .agg(
+            incidents=("reported_date", "size"),
+            serious_injuries=("SERIOUSLY_INJURED", "sum"),
+            fatalities=("FATALITIES", "sum"),
+        )
+        .reset_index()
+    )
+    for col in ["incidents", "serious_injuries", "fatalities"]:
+        cube[col] = cube[col].astype(np.int32)
+    return cube.sort_values("day", kind="stable").reset_index(drop=True)
+
+
+def query_cube(cube, start_date, end_date, neighborhoods, weather=None):
+    """
+    Returns the cube rows for the inclusive day range, selected neighborhoods
+    and, if given, weather conditions. The day range is located by binary
+    search on the sorted 'day' column.
+    """
+    days = cube["day"].to_numpy()
+    lo = np.searchsorted(days, np.datetime64(pd.Timestamp(start_date)), side="left")
+    hi = np.searchsorted(days, np.datetime64(pd.Timestamp(end_date)), side="right")
+    window = cube.iloc[lo:hi]
+    selected = window["neighborhood_id"].isin(neighborhoods)
+    if weather:
+        selected &= window["weather_condition"].isin(weather)
+    return window[selected]
+
+
+def summarize_cube(cube, start_date, end_date, neighborhoods, weather=None):
+    """
+    Returns the Dashboard KPIs and light condition counts for a filter state,
+    computed from the daily cube.
+    """
+    window = query_cube(cube, start_date, end_date, neighborhoods, weather)
+    light_counts = window.groupby("LIGHT_CONDITION", observed=True)["incidents"].sum().reset_index()
+    light_counts.columns = ["Light Condition", "Incident Count"]
+    return {
+        "incidents": int(window["incidents"].sum()),
+        "serious_injuries": int(window["serious_injuries"].sum()),
+        "fatalities": int(window["fatalities"].sum()),
+        "light_counts": light_counts,
+    }
+
+
+def summarize_rows(df, positions):
+    """
+    Returns the same KPIs and light condition counts as summarize_cube() for
+    an explicit set of row positions (used when an area filter is active).
+    """
+    rows = df.take(positions)
+    light_counts = category_counts(rows["LIGHT_CONDITION"])
+    light_counts = light_counts[light_counts > 0].reset_index()
+    light_counts.columns = ["Light Condition", "Incident Count"]
+    return {
+        "incidents": len(rows),
+        "serious_injuries": int(rows["SERIOUSLY_INJURED"].sum()),
+        "fatalities": int(rows["FATALITIES"].sum()),
+        "light_counts": light_counts,
+    }
+
+
+@st.cache_resource(max_entries=1)
+def _daily_cube_for_version(version):
+    note_cache_miss()
+    df = load_dataset()
+    if df.empty:
+        return pd.DataFrame()
+    return build_daily_cube(df)
+
+
+def load_daily_cube():
+    """Returns the daily cube for the current dataset, built once per dataset version."""
+    with track_cache("load_daily_cube"):
+        return _daily_cube_for_version(dataset_version())
+
+
+# --- Hour x Weekday Histogram ---
+def hour_by_weekday_counts(df):
+    """
+    Counts incidents per (weekday, hour) as a 7x24 array, Monday first.
+    Uses a single bincount over combined integer keys rather than string columns.
+    """
+    dates = df["reported_date"].dt
+    keys = dates.dayofweek.to_numpy() * 24 + dates.hour.to_numpy()
+    return np.bincount(keys, minlength=7 * 24).reshape(7, 24)
+
+
+def histogram_box_stats(counts):
+    """
+    Computes box plot statistics for a distribution given as counts per integer
+    value (index = value). Quartiles use linear interpolation, and whiskers reach
+    the most extreme values within 1.5 IQR of the box, matching Plotly's defaults.
+    Returns None for an empty distribution.
+    """
+    total = int(counts.sum())
+    if total == 0:
+        return None
+    cumulative = np.cumsum(counts)
+
+    def value_at(rank):
+        # Value of the rank-th (0-based) observation in sorted order
+        return int(np.searchsorted(cumulative, rank, side="right"))
+
+    def quantile(q):
+        position = q * (total - 1)
+        below = int(np.floor(position))
+        fraction = position - below
+        low = value_at(below)
+        high = value_at(min(below + 1, total - 1))
+        return low + fraction * (high - low)
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    iqr = q3 - q1
+    values = np.flatnonzero(counts)
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+    return {
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "lowerfence": int(inside.min()),
+        "upperfence": int(inside.max()),
+        "outliers": outliers,
+        "outlier_counts": counts[outliers],
+    }
+
+
+# --- Time Series ---
+# Every granularity and rolling average is derived from the precomputed
+# per-day, per-neighborhood counts: filter, sum per day, then roll up the short
+# daily series. Raw incident rows are never resampled.
+TIME_GRANULARITIES = {"Daily": "D", "Weekly": "W-SUN", "Monthly": "ME", "Yearly": "YE"}
+
+
+def daily_series(daily, start_date=None, end_date=None, neighborhoods=None, weather=None):
+    """
+    Returns incidents per calendar day for the optional filters, with days
+    without incidents as zeros. `daily` must be sorted by 'day'.
+    """
+    days = daily["day"].to_numpy()
+    if len(days) == 0:
+        return pd.Series(dtype=np.int64)
+    start = pd.Timestamp(start_date) if start_date is not None else pd.Timestamp(days[0])
+    end = pd.Timestamp(end_date) if end_date is not None else pd.Timestamp(days[-1])
+    lo = np.searchsorted(days, np.datetime64(start), side="left")
+    hi = np.searchsorted(days, np.datetime64(end), side="right")
+    window = daily.iloc[lo:hi]
+    if neighborhoods is not None:
+        window = window[window["neighborhood_id"].isin(neighborhoods)]
+    if weather:
+        window = window[window["weather_condition"].isin(weather)]
+    counts = window.groupby("day")["incidents"].sum()
+    return counts.reindex(pd.date_range(start, end, freq="D", name="day"), fill_value=0)
+
+
+def rollup_series(series, granularity, window=1):
+    """
+    Rolls a daily series up to the granularity and adds a trailing rolling
+    mean over `window` periods. Returns a frame with 'incidents' and 'rolling'.
+    """
+    counts = series.resample(TIME_GRANULARITIES[granularity]).sum()
+    return pd.DataFrame({
+        "incidents": counts,
+        "rolling": counts.rolling(window, min_periods=1).mean(),
+    })
+
+
+# --- Precomputed Chart Aggregates ---
+# Daily (by neighborhood), neighborhood, offense and hour x weekday counts
+# behind the EDA Gallery, plus counts and serious injuries by weather when the data was
+# enriched. They are computed per Parquet row group (optionally across a process
+# pool), merged by summing, and stored next to the cleaned data.
+AGGREGATES_PATH = os.path.join(DATA_DIR, "Denver_Traffic_Aggregates")
+AGGREGATE_COLUMNS = ["reported_date", "neighborhood_id", "top_traffic_accident_offense"]
+WEATHER_AGGREGATE_COLUMNS = ["weather_condition", "SERIOUSLY_INJURED"]
+# Aggregates that are Series indexed by a category's values
+CATEGORY_AGGREGATES = ["neighborhood", "offense", "weather", "weather_serious"]
+
+
+def compute_aggregates(df):
+    """Computes the chart aggregates for a frame (or one partition of it)."""
+    aggregates = {
+        "daily": daily_counts(df),
+        "neighborhood": category_counts(encode_category(df["neighborhood_id"])),
+        "offense": category_counts(encode_category(df["top_traffic_accident_offense"])),
+        "hour_weekday": hour_by_weekday_counts(df),
+    }
+    if "weather_condition" in df.columns:
+        weather = encode_category(df["weather_condition"])
+        aggregates["weather"] = category_counts(weather)
+        aggregates["weather_serious"] = category_counts(weather, weights=df["SERIOUSLY_INJURED"]).astype(np.int64)
+    return aggregates
+
+
+def daily_counts(df):
+    """
+    Counts incidents per day and neighborhood (and weather condition when
+    present), with the categories stored as plain strings.
+    """
+    day = df["reported_date"].dt.normalize().rename("day")
+    dimensions = ["neighborhood_id"] + [col for col in WEATHER_CATEGORY_COLUMNS if col in df.columns]
+    daily = df.groupby([day] + [df[col].astype(str).where(df[col].notna()) for col in dimensions],
+                       dropna=False).size()
+    return daily.rename("incidents").reset_index()
+
+
+def merge_aggregates(parts):
+    """Sums partial aggregates from several partitions into one set (None if all were empty)."""
+    parts = [part for part in parts if part is not None]
+    if not parts:
+        return None
+    daily = pd.concat([part["daily"] for part in parts])
+    dimensions = [col for col in daily.columns if col != "incidents"]
+    merged = {
+        "daily": (
+            daily.groupby(dimensions, dropna=False)["incidents"].sum().reset_index()
+            .sort_values("day", kind="stable").reset_index(drop=True)
+        ),
+        "hour_weekday": sum(part["hour_weekday"] for part in parts),
+    }
+    for name in CATEGORY_AGGREGATES:
+        # Weather aggregates exist only when every partition was enriched
+        if not all(name in part for part in parts):
+            continue
+        counts = pd.concat([part[name].rename_axis(None) for part in parts])
+        merged[name] = counts.groupby(level=0).sum()
+    return merged
+
+
+def artifact_row_groups(parquet_path=CLEAN_PARQUET_PATH):
+    """
+    Lists the artifact's row groups as (file, row group, first row, rows) in
+    the order the loader reads them, where first row is the group's position
+    in the concatenated dataset.
+    """
+    import pyarrow.parquet as pq
+    groups, first_row = [], 0
+    for path in pq.ParquetDataset(parquet_path).files:
+        metadata = pq.ParquetFile(path).metadata
+        for group in range(metadata.num_row_groups):
+            n_rows = metadata.row_group(group).num_rows
+            groups.append((path, group, first_row, n_rows))
+            first_row += n_rows
+    return groups
+
+
+def superseded_rows(groups):
+    """
+    Returns the dataset positions of rows the loader drops as superseded
+    records, using the same rule (latest_record_mask) over the whole artifact.
+    """
+    import pyarrow.parquet as pq
+    if not groups or not all(set(RECORD_COLUMNS).issubset(pq.ParquetFile(path).schema_arrow.names)
+                             for path in dict.fromkeys(path for path, *_ in groups)):
+        # Artifacts written before record keys existed have nothing to supersede
+        return np.array([], dtype=np.int64)
+    records = pd.concat([pq.ParquetFile(path).read_row_group(group, columns=RECORD_COLUMNS).to_pandas()
+                         for path, group, *_ in groups], ignore_index=True)
+    return np.flatnonzero(~latest_record_mask(records["record_key"], records["ingest_batch"]))
+
+
+def aggregate_row_group(path, group, dropped=None):
+    """Reads one row group of the Parquet artifact and aggregates it (process pool worker)."""
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(path)
+    columns = list(AGGREGATE_COLUMNS)
+    if "weather_condition" in parquet_file.schema_arrow.names:
+        columns += WEATHER_AGGREGATE_COLUMNS
+    df = parquet_file.read_row_group(group, columns=columns).to_pandas()
+    if dropped is not None and len(dropped):
+        df = df.drop(index=df.index[dropped])
+    df["reported_date"] = pd.to_datetime(df["reported_date"])
+    if df.empty:
+        return None
+    return compute_aggregates(df)
+
+
+def build_aggregates(parquet_path=CLEAN_PARQUET_PATH, workers=1):
+    """
+    Aggregates every row group of the Parquet artifact and merges the results.
+    Rows the loader would drop as superseded records are skipped, so the totals
+    match the loaded frame. With workers > 1 the row groups are spread across a
+    process pool.
+    """
+    if not os.path.exists(parquet_path):
+        return None
+    groups = artifact_row_groups(parquet_path)
+    superseded = superseded_rows(groups)
+    paths, group_numbers, dropped = [], [], []
+    for path, group, first_row, n_rows in groups:
+        lo, hi = np.searchsorted(superseded, [first_row, first_row + n_rows])
+        paths.append(path)
+        group_numbers.append(group)
+        # Positions within the row group
+        dropped.append(superseded[lo:hi] - first_row)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(aggregate_row_group, paths, group_numbers, dropped))
+    else:
+        parts = [aggregate_row_group(*task) for task in zip(paths, group_numbers, dropped)]
+    return merge_aggregates(parts)
+
+
+def write_aggregates(aggregates, version, path=AGGREGATES_PATH):
+    """Stores the aggregates as small Parquet files tagged with the dataset version."""
+    os.makedirs(path, exist_ok=True)
+    aggregates["daily"].to_parquet(os.path.join(path, "daily.parquet"), index=False)
+    for name in CATEGORY_AGGREGATES:
+        file_path = os.path.join(path, f"{name}.parquet")
+        if name not in aggregates:
+            # Don't leave weather aggregates from an earlier, enriched build behind
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            continue
+        counts = aggregates[name].astype("int64").rename("incidents").rename_axis("value").reset_index()
+        counts["value"] = counts["value"].astype(str)
+        counts.to_parquet(file_path, index=False)
+    pd.DataFrame(aggregates["hour_weekday"]).rename(columns=str).to_parquet(
+        os.path.join(path, "hour_weekday.parquet"), index=False)
+    with open(os.path.join(path, "version.txt"), "w") as f:
+        f.write(version)
+
+
+def read_aggregates(version, path=AGGREGATES_PATH):
+    """Reads stored aggregates if they were built for this dataset version, else None."""
+    try:
+        with open(os.path.join(path, "version.txt")) as f:
+            if f.read().strip() != version:
+                return None
+        aggregates = {
+            "daily": pd.read_parquet(os.path.join(path, "daily.parquet")),
+            "hour_weekday": pd.read_parquet(os.path.join(path, "hour_weekday.parquet")).to_numpy(),
+        }
+        for name in CATEGORY_AGGREGATES:
+            file_path = os.path.join(path, f"{name}.parquet")
+            if name.startswith("weather") and not os.path.exists(file_path):
+                continue
+            aggregates[name] = pd.read_parquet(file_path).set_index("value")["incidents"]
+        return aggregates
+    except (OSError, ImportError, ValueError):
+        return None
+
+
+@st.cache_resource(max_entries=1)
+def _aggregates_for_version(version):
+    note_cache_miss()
+    stored = read_aggregates(version)
+    if stored is not None:
+        return stored
+    df = load_dataset()
+    if df.empty:
+        return None
+    return compute_aggregates(df)
+
+
+def load_aggregates():
+    """
+    Returns the chart aggregates for the current dataset: the precomputed
+    artifact when it matches the dataset version, otherwise computed once from
+    the loaded frame.
+    """
+    with track_cache("load_aggregates"):
+        return _aggregates_for_version(dataset_version())
@@ -0,0 +1,236 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from Data.loader import read_clean_data, DATA_DIR
+
+# --- Hotspot Forecast ---
+# A per neighborhood x hour-of-week Poisson rate model. Weekly incident counts
+# are combined with exponential decay, so recent weeks count more and new
+# weeks can be folded in without revisiting old ones. Sparse cells are shrunk
+# toward the neighborhood's weekly total spread over the city-wide hourly
+# profile. Training runs offline; the app only reads the prediction table.
+FORECAST_DIR = os.path.join(DATA_DIR, "Denver_Traffic_Forecast")
+MODEL_PATH = os.path.join(FORECAST_DIR, "model.npz")
+PREDICTIONS_PATH = os.path.join(FORECAST_DIR, "predictions.parquet")
+HOURS_PER_WEEK = 7 * 24
+HALF_LIFE_WEEKS = 52
+PRIOR_WEEKS = 8  # strength of the shrinkage toward the neighborhood profile
+HOLDOUT_WEEKS = 4
+# 1970-01-05 was a Monday, so week numbers count Monday-to-Sunday weeks
+EPOCH_MONDAY = np.datetime64("1970-01-05")
+
+
+# --- Features ---
+def week_numbers(dates):
+    """Returns the Monday-based week number of each timestamp."""
+    return (dates.to_numpy().astype("datetime64[D]") - EPOCH_MONDAY).astype(np.int64) // 7
+
+
+def week_start(week):
+    """Returns the Monday that starts a week number."""
+    return pd.Timestamp(EPOCH_MONDAY + np.timedelta64(int(week) * 7, "D"))
+
+
+def last_complete_week(df):
+    """Returns the last week fully covered by the data (the latest week ends on a Sunday)."""
+    last_date = df["reported_date"].iloc[-1]
+    return int(week_numbers(pd.Series([last_date]))[0]) - (0 if last_date.dayofweek == 6 else 1)
+
+
+def weekly_features(df, neighborhoods):
+    """
+    Returns the week number and (neighborhood, hour-of-week) cell of every
+    row with a known neighborhood, as integer arrays for bincount.
+    """
+    codes = pd.Categorical(df["neighborhood_id"], categories=neighborhoods).codes
+    known = codes >= 0
+    dates = df["reported_date"][known]
+    hour_of_week = dates.dt.dayofweek.to_numpy() * 24 + dates.dt.hour.to_numpy()
+    return week_numbers(dates), codes[known].astype(np.int64) * HOURS_PER_WEEK + hour_of_week
+
+
+def decayed_counts(weeks, cells, first_week, last_week, n_cells, decay):
+    """Sums incidents per cell over [first_week, last_week], weighting each week by decay ** age."""
+    window = (weeks >= first_week) & (weeks <= last_week)
+    weights = decay ** (last_week - weeks[window]).astype(np.float64)
+    counts = np.bincount(cells[window], weights=weights, minlength=n_cells)
+    n_weeks = last_week - first_week + 1
+    exposure = float(np.sum(decay ** np.arange(n_weeks))) if n_weeks > 0 else 0.0
+    return counts, exposure
+
+
+# --- Model ---
+def new_model(neighborhoods, half_life_weeks=HALF_LIFE_WEEKS):
+    """Returns an untrained model for the given neighborhoods."""
+    return {
+        "neighborhoods": np.asarray(neighborhoods, dtype=str),
+        "counts": np.zeros((len(neighborhoods), HOURS_PER_WEEK)),
+        "exposure": 0.0,
+        "last_week": None,
+        "decay": 0.5 ** (1 / half_life_weeks),
+    }
+
+
+def extend_neighborhoods(model, neighborhoods):
+    """Adds rows for neighborhoods the model hasn't seen yet."""
+    new = [name for name in neighborhoods if name not in set(model["neighborhoods"])]
+    if new:
+        model["neighborhoods"] = np.concatenate([model["neighborhoods"], np.asarray(new, dtype=str)])
+        model["counts"] = np.vstack([model["counts"], np.zeros((len(new), HOURS_PER_WEEK))])
+    return model
+
+
+def update_model(model, df, through_week=None):
+    """
+    Folds every complete week after the model's last trained week into it.
+    Returns the number of weeks added.
+    """
+    model = extend_neighborhoods(model, df["neighborhood_id"].dropna().astype(str).unique())
+    through_week = last_complete_week(df) if through_week is None else through_week
+    weeks, cells = weekly_features(df, model["neighborhoods"])
+    if model["last_week"] is None:
+        first_week = int(weeks.min()) if len(weeks) else through_week + 1
+    else:
+        first_week = model["last_week"] + 1
+    if through_week < first_week:
+        return 0
+
+    counts, exposure = decayed_counts(weeks, cells, first_week, through_week, model["counts"].size, model["decay"])
+    age = model["decay"] ** (through_week - first_week + 1)
+    model["counts"] = model["counts"] * age + counts.reshape(model["counts"].shape)
+    model["exposure"] = model["exposure"] * age + exposure
+    model["last_week"] = through_week
+    return through_week - first_week + 1
+
+
+def expected_counts(model):
+    """Expected incidents per neighborhood and hour-of-week for the week after training."""
+    counts, exposure = model["counts"], max(model["exposure"], 1e-9)
+    total = counts.sum()
+    if total == 0:
+        return np.zeros_like(counts)
+    city_profile = counts.sum(axis=0) / total
+    prior = counts.sum(axis=1, keepdims=True) / exposure * city_profile
+    return (counts + PRIOR_WEEKS * prior) / (exposure + PRIOR_WEEKS)
+
+
+def prediction_table(model):
+    """Flattens the model's expected counts into one row per neighborhood, weekday and hour."""
+    expected = expected_counts(model)
+    n_neighborhoods = len(model["neighborhoods"])
+    hour_of_week = np.tile(np.arange(HOURS_PER_WEEK), n_neighborhoods)
+    mean = expected.mean() if expected.size else 0.0
+    return pd.DataFrame({
+        "neighborhood_id": np.repeat(model["neighborhoods"], HOURS_PER_WEEK),
+        "weekday": hour_of_week // 24,
+        "hour": hour_of_week % 24,
+        "expected_incidents": expected.ravel(),
+        # Relative to the average neighborhood-hour, so 2.0 means twice the typical risk
+        "risk_ratio": expected.ravel() / mean if mean > 0 else 0.0,
+        "forecast_week": week_start(model["last_week"] + 1),
+    })
+
+
+def save_model(model, path=MODEL_PATH):
+    """Persists the model's decayed counts so later runs can update it incrementally."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, neighborhoods=model["neighborhoods"], counts=model["counts"], exposure=model["exposure"],
+             last_week=model["last_week"], decay=model["decay"])
+
+
+def read_model(path=MODEL_PATH):
+    """Reads a saved model, or None if none has been trained yet."""
+    if not os.path.exists(path):
+        return None
+    saved = np.load(path)
+    return {
+        "neighborhoods": saved["neighborhoods"].astype(str),
+        "counts": saved["counts"],
+        "exposure": float(saved["exposure"]),
+        "last_week": int(saved["last_week"]),
+        "decay": float(saved["decay"]),
+    }
+
+
+# --- Evaluation ---
+def backtest(df, holdout_weeks=HOLDOUT_WEEKS):
+    """
+    Trains on all but the last complete weeks and compares the forecast with a
+    flat per-neighborhood average on those weeks. Returns both mean absolute errors.
+    """
+    last_week = last_complete_week(df)
+    neighborhoods = sorted(df["neighborhood_id"].dropna().astype(str).unique())
+    model = new_model(neighborhoods)
+    update_model(model, df, through_week=last_week - holdout_weeks)
+    expected = expected_counts(model)
+    baseline = np.repeat(model["counts"].sum(axis=1, keepdims=True) / max(model["exposure"], 1e-9) / HOURS_PER_WEEK,
+                         HOURS_PER_WEEK, axis=1)
+
+    weeks, cells = weekly_features(df, model["neighborhoods"])
+    model_error, baseline_error = [], []
+    for week in range(last_week - holdout_weeks + 1, last_week + 1):
+        actual = np.bincount(cells[weeks == week], minlength=expected.size).reshape(expected.shape)
+        model_error.append(np.abs(actual - expected).mean())
+        baseline_error.append(np.abs(actual - baseline).mean())
+    return float(np.mean(model_error)), float(np.mean(baseline_error))
+
+
+# --- Dashboard Lookup ---
+@st.cache_resource(max_entries=1)
+def _predictions_for_stamp(stamp):
+    try:
+        return pd.read_parquet(PREDICTIONS_PATH)
+    except Exception as e:
+        st.error(f"An error occurred while loading the forecast: {e}")
+        return None
+
+
+def load_predictions():
+    """Returns the precomputed prediction table, or None if the model hasn't been trained."""
+    if not os.path.exists(PREDICTIONS_PATH):
+        return None
+    return _predictions_for_stamp(os.stat(PREDICTIONS_PATH).st_mtime_ns)
+
+
+# --- Training ---
+def run_training(incremental=False, half_life_weeks=HALF_LIFE_WEEKS):
+    df = read_clean_data()
+    if df.empty:
+        print("No clean data found; run Data/Denver_Traffic_EDA.py first.")
+        return
+
+    model = read_model() if incremental else None
+    if model is None:
+        model_error, baseline_error = backtest(df)
+        print(f"Backtest over the last {HOLDOUT_WEEKS} weeks: mean absolute error {model_error:.4f} "
+              f"per neighborhood-hour (flat neighborhood average: {baseline_error:.4f})")
+        model = new_model(sorted(df["neighborhood_id"].dropna().astype(str).unique()), half_life_weeks)
+
+    added = update_model(model, df)
+    if model["last_week"] is None:
+        print("Not enough data for a complete week; nothing to train.")
+        return
+    if added == 0:
+        print(f"No new complete weeks since {week_start(model['last_week']).date()}; the forecast is unchanged.")
+        return
+    print(f"Trained on {added} new week(s) through {week_start(model['last_week']).date()}")
+
+    save_model(model)
+    prediction_table(model).to_parquet(PREDICTIONS_PATH, index=False)
+    print(f"Forecast for the week of {week_start(model['last_week'] + 1).date()} saved to {PREDICTIONS_PATH}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the neighborhood hotspot forecast.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Fold only the weeks newer than the saved model into it.")
+    parser.add_argument("--half-life", type=int, default=HALF_LIFE_WEEKS,
+                        help="Weeks after which a week's incidents count half as much (full retrain only).")
+    args = parser.parse_args()
+    run_training(args.incremental, args.half_life)
@@ -0,0 +1,133 @@
+import pandas as pd
+import numpy as np
+from Data.loader import load_dataset
+from Data.map_bins import filtered_positions
+from Data.spatial_index import METERS_PER_DEGREE
+
+# --- Hotspot Detection ---
+# Grid-accelerated density clustering in the spirit of DBSCAN: incidents are
+# binned into square cells of HOTSPOT_CELL_METERS, a cell is "core" when its
+# 3x3 neighborhood is dense, and touching core cells are merged into one
+# hotspot. Each hotspot is then scored by the harm of its incidents rather
+# than their count alone.
+HOTSPOT_CELL_METERS = 150
+# Dense means at least this many incidents, and at least this multiple of the
+# selection's median neighborhood density (so long date ranges don't merge
+# the whole city into one cluster)
+HOTSPOT_MIN_INCIDENTS = 15
+HOTSPOT_DENSITY_FACTOR = 3
+HOTSPOT_LIMIT = 10
+# Severity score: one point per incident plus extra weight for serious
+# injuries and fatalities, similar to equivalent-property-damage-only scoring
+SEVERITY_WEIGHTS = {"incidents": 1, "serious_injuries": 10, "fatalities": 50}
+NEIGHBOR_OFFSETS = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if (dy, dx) != (0, 0)]
+
+
+def neighbor_lookup(keys, width, dy, dx):
+    """Returns, for each sorted cell key, the position of its (dy, dx) neighbor in keys or -1."""
+    target = keys + dy * width + dx
+    found = np.searchsorted(keys, target)
+    found = np.minimum(found, len(keys) - 1)
+    return np.where(keys[found] == target, found, -1)
+
+
+def label_components(keys, width):
+    """
+    Labels 8-connected groups of cells by propagating the smallest label to
+    neighbors until nothing changes. Keys must be sorted and unique.
+    """
+    labels = np.arange(len(keys))
+    neighbors = [neighbor_lookup(keys, width, dy, dx) for dy, dx in NEIGHBOR_OFFSETS]
+    changed = True
+    while changed:
+        changed = False
+        for found in neighbors:
+            has_neighbor = found >= 0
+            candidate = np.where(has_neighbor, labels[np.maximum(found, 0)], labels)
+            smaller = candidate < labels
+            if smaller.any():
+                labels = np.where(smaller, candidate, labels)
+                changed = True
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def find_hotspots(lat, lon, serious, fatal, cell_meters=HOTSPOT_CELL_METERS,
+                  min_incidents=HOTSPOT_MIN_INCIDENTS, limit=HOTSPOT_LIMIT):
+    """
+    Clusters incident coordinates into hotspots ranked by severity score.
+    Returns one row per hotspot with its centroid, extent and harm totals.
+    """
+    columns = ["rank", "lat", "lon", "radius_m", "incidents", "serious_injuries", "fatalities", "severity"]
+    if len(lat) == 0:
+        return pd.DataFrame(columns=columns)
+
+    # Local equirectangular projection so cells are square in meters
+    lat0 = float(np.mean(lat))
+    y = lat * METERS_PER_DEGREE
+    x = lon * METERS_PER_DEGREE * np.cos(np.radians(lat0))
+    iy = np.floor(y / cell_meters).astype(np.int64)
+    ix = np.floor(x / cell_meters).astype(np.int64)
+    iy -= iy.min() - 1
+    ix -= ix.min() - 1
+    # A spare column on each side keeps neighbor keys from wrapping across rows
+    width = ix.max() + 2
+    point_keys = iy * width + ix
+    keys, point_cell, counts = np.unique(point_keys, return_inverse=True, return_counts=True)
+
+    # Density over each cell's 3x3 neighborhood
+    density = counts.copy()
+    for dy, dx in NEIGHBOR_OFFSETS:
+        found = neighbor_lookup(keys, width, dy, dx)
+        density += np.where(found >= 0, counts[np.maximum(found, 0)], 0)
+    core = density >= max(min_incidents, HOTSPOT_DENSITY_FACTOR * np.median(density))
+    if not core.any():
+        return pd.DataFrame(columns=columns)
+
+    core_cells = np.flatnonzero(core)
+    cluster_of_core = label_components(keys[core_cells], width)
+    cluster_of_cell = np.full(len(keys), -1)
+    cluster_of_cell[core_cells] = cluster_of_core
+    cluster = cluster_of_cell[point_cell]
+    members = cluster >= 0
+
+    clusters = pd.DataFrame({
+        "cluster": cluster[members],
+        "lat": lat[members],
+        "lon": lon[members],
+        "serious_injuries": serious[members].astype(np.int64),
+        "fatalities": fatal[members].astype(np.int64),
+    })
+    hotspots = clusters.groupby("cluster").agg(
+        lat=("lat", "mean"),
+        lon=("lon", "mean"),
+        lat_span=("lat", lambda v: v.max() - v.min()),
+        lon_span=("lon", lambda v: v.max() - v.min()),
+        incidents=("lat", "size"),
+        serious_injuries=("serious_injuries", "sum"),
+        fatalities=("fatalities", "sum"),
+    )
+    # Clusters that only qualified through their neighbors' incidents are noise
+    hotspots = hotspots[hotspots["incidents"] >= min_incidents]
+    hotspots["severity"] = sum(hotspots[col] * weight for col, weight in SEVERITY_WEIGHTS.items())
+    # Half the larger side of the cluster's extent, but never smaller than one cell
+    extent = np.maximum(hotspots["lat_span"], hotspots["lon_span"] * np.cos(np.radians(lat0)))
+    hotspots["radius_m"] = np.maximum(extent * METERS_PER_DEGREE / 2, cell_meters / 2)
+    hotspots = hotspots.sort_values(["severity", "incidents"], ascending=False).head(limit)
+    hotspots["rank"] = np.arange(1, len(hotspots) + 1)
+    return hotspots.reset_index(drop=True)[columns]
+
+
+def hotspot_payload(start_date, end_date, neighborhoods, area=None, weather=None):
+    """
+    Returns the ranked hotspots for a filter state.
+    The Dashboard caches the result per filter state in the shared result cache.
+    """
+    df = load_dataset()
+    rows = df.take(filtered_positions(start_date, end_date, neighborhoods, area, weather))
+    rows = rows.dropna(subset=["geo_lat", "geo_lon"])
+    return find_hotspots(
+        rows["geo_lat"].to_numpy(dtype=np.float64),
+        rows["geo_lon"].to_numpy(dtype=np.float64),
+        rows["SERIOUSLY_INJURED"].to_numpy(),
+        rows["FATALITIES"].to_numpy(),
+    )
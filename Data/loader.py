@@ -0,0 +1,314 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import glob
+import hashlib
+import os
+import shutil
+
+from Utils.profiling import track_cache, note_cache_miss
+
+try:
+    import pyarrow  # noqa: F401 -- optional, enables the Parquet fast path
+except ImportError:
+    pyarrow = None
+
+# --- Paths ---
+# The artifacts live next to this module unless DENVER_TRAFFIC_DATA_DIR points
+# elsewhere (used by the benchmark suite to load synthetic datasets).
+DATA_DIR = os.environ.get("DENVER_TRAFFIC_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+CLEAN_CSV_PATH = os.path.join(DATA_DIR, "Denver_Traffic_Clean.csv")
+CLEAN_PARQUET_PATH = os.path.join(DATA_DIR, "Denver_Traffic_Clean.parquet")
+
+# --- Column Types ---
+# Only the columns the pages actually read are loaded, with compact dtypes.
+CATEGORY_COLUMNS = ["neighborhood_id", "top_traffic_accident_offense", "LIGHT_CONDITION"]
+FLOAT_COLUMNS = ["geo_lat", "geo_lon"]
+COUNT_COLUMNS = ["SERIOUSLY_INJURED", "FATALITIES"]
+DATASET_COLUMNS = ["reported_date"] + CATEGORY_COLUMNS + FLOAT_COLUMNS + COUNT_COLUMNS
+# Written by the cleaning script so incremental re-ingests can supersede older rows
+RECORD_COLUMNS = ["record_key", "ingest_batch"]
+# record_key of rows without any incident/offense id; such rows never supersede
+# each other
+UNKEYED_RECORD = 0
+# Joined from a local weather file during cleaning; absent when none was provided
+WEATHER_CATEGORY_COLUMNS = ["weather_condition"]
+WEATHER_FLOAT_COLUMNS = ["temperature_f", "precipitation_in"]
+WEATHER_COLUMNS = WEATHER_CATEGORY_COLUMNS + WEATHER_FLOAT_COLUMNS
+
+CSV_DTYPES = {
+    **{col: "category" for col in CATEGORY_COLUMNS + WEATHER_CATEGORY_COLUMNS},
+    **{col: np.float32 for col in FLOAT_COLUMNS + WEATHER_FLOAT_COLUMNS},
+}
+
+
+# --- Date Parsing ---
+# Formats seen in the Denver extract (and in CSVs re-saved by pandas). The
+# first one that parses a sample of the values is used for the whole column.
+KNOWN_DATE_FORMATS = ["%m/%d/%Y %I:%M:%S %p", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"]
+DATE_SAMPLE_SIZE = 100
+
+
+def detect_date_format(values):
+    """Returns the first known format that parses every sampled value, or None."""
+    sample = pd.Series(values[:DATE_SAMPLE_SIZE]).dropna()
+    for date_format in KNOWN_DATE_FORMATS:
+        try:
+            pd.to_datetime(sample, format=date_format)
+            return date_format
+        except (ValueError, TypeError):
+            continue
+    return None
+
+
+def parse_dates(values):
+    """
+    Parses a column of date strings, converting each distinct string once.
+    Uses a detected fixed format when possible; strings that don't match it
+    fall back to per-element inference. Returns the parsed series and the
+    number of non-empty values that could not be parsed (coerced to NaT).
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values, 0
+    # Incident timestamps repeat heavily, so parse the unique strings only
+    codes, uniques = pd.factorize(values)
+    if len(uniques) == 0:
+        # Empty or entirely missing column
+        return pd.Series(pd.NaT, index=values.index, name=values.name, dtype="datetime64[ns]"), 0
+    uniques = pd.Series(uniques, dtype=object)
+    date_format = detect_date_format(uniques)
+    if date_format is None:
+        parsed = pd.to_datetime(uniques, errors="coerce", format="mixed")
+    else:
+        parsed = pd.to_datetime(uniques, errors="coerce", format=date_format)
+        unmatched = parsed.isna()
+        if unmatched.any():
+            parsed[unmatched] = pd.to_datetime(uniques[unmatched], errors="coerce", format="mixed")
+    failed = int(parsed.isna().to_numpy()[codes[codes >= 0]].sum())
+    # Missing values have code -1 and stay NaT
+    result = parsed.to_numpy().take(codes)
+    result[codes < 0] = np.datetime64("NaT")
+    return pd.Series(result, index=values.index, name=values.name), failed
+
+
+# --- Dictionary Encoding ---
+def encode_category(values):
+    """
+    Dictionary-encodes a column: int codes plus a sorted vocabulary holding
+    only the values that occur, so codes can be counted with bincount.
+    """
+    values = values.astype("category").cat.remove_unused_categories()
+    categories = values.cat.categories
+    if not categories.is_monotonic_increasing:
+        values = values.cat.reorder_categories(categories.sort_values())
+    return values
+
+
+def category_counts(values, weights=None):
+    """
+    Counts a dictionary-encoded column by its codes, indexed by the vocabulary.
+    With weights, sums them per category instead.
+    """
+    codes = values.cat.codes.to_numpy()
+    known = codes >= 0
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)[known]
+    counts = np.bincount(codes[known], weights=weights, minlength=len(values.cat.categories))
+    return pd.Series(counts, index=values.cat.categories.astype(str), name="count")
+
+
+def apply_dataset_types(df):
+    """
+    Converts the dataset columns to their compact dtypes and parses 'reported_date'.
+    Rows without a valid 'reported_date' are dropped.
+    """
+    df["reported_date"], failed = parse_dates(df["reported_date"])
+    if failed:
+        print(f"[load] {failed:,} 'reported_date' values could not be parsed and were dropped")
+    df = df.dropna(subset=["reported_date"]).reset_index(drop=True)
+    for col in CATEGORY_COLUMNS:
+        df[col] = encode_category(df[col])
+    for col in FLOAT_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype(np.float32)
+    # Injury/fatality counts are small integers; missing values count as zero
+    for col in COUNT_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(np.int8)
+    for col in WEATHER_CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = encode_category(df[col])
+    for col in WEATHER_FLOAT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(np.float32)
+    return df
+
+
+def parquet_available(path=CLEAN_PARQUET_PATH):
+    """Returns True when the Parquet artifact exists and can be read."""
+    return pyarrow is not None and os.path.exists(path)
+
+
+def read_clean_data(csv_path=CLEAN_CSV_PATH, parquet_path=CLEAN_PARQUET_PATH):
+    """
+    Reads the cleaned traffic accident data with explicit, compact dtypes.
+    Prefers the typed Parquet artifact written by Denver_Traffic_EDA.py and
+    falls back to parsing the CSV.
+    """
+    wanted = DATASET_COLUMNS + WEATHER_COLUMNS + RECORD_COLUMNS
+    if parquet_available(parquet_path):
+        import pyarrow.parquet as pq
+        available = pq.ParquetDataset(parquet_path).schema.names
+        df = pd.read_parquet(parquet_path, columns=[col for col in wanted if col in available])
+    else:
+        df = pd.read_csv(csv_path, usecols=lambda col: col in wanted, dtype=CSV_DTYPES)
+    df = apply_dataset_types(drop_superseded_records(df))
+    # Sorted by date so date ranges can be located by binary search
+    return df.sort_values("reported_date", kind="stable").reset_index(drop=True)
+
+
+def drop_superseded_records(df):
+    """
+    Keeps only the latest ingested version of each record and drops the
+    bookkeeping columns. Data cleaned before record keys existed is unchanged.
+    """
+    if not set(RECORD_COLUMNS).issubset(df.columns):
+        return df.drop(columns=RECORD_COLUMNS, errors="ignore")
+    if df["record_key"].duplicated().any():
+        df = df[latest_record_mask(df["record_key"], df["ingest_batch"])]
+    return df.drop(columns=RECORD_COLUMNS)
+
+
+def latest_record_mask(record_keys, ingest_batches):
+    """
+    Marks the row that survives for each record key: the last row of its
+    newest ingest batch. Unkeyed rows always survive. Shared by the loader and the aggregate build so both
+    resolve duplicate records the same way.
+    """
+    record_keys = np.asarray(record_keys)
+    order = np.argsort(np.asarray(ingest_batches), kind="stable")
+    keep = np.empty(len(order), dtype=bool)
+    keep[order] = ~pd.Series(record_keys[order]).duplicated(keep="last").to_numpy()
+    return keep | (record_keys == UNKEYED_RECORD)
+
+
+# --- Dataset Version ---
+def dataset_version(csv_path=CLEAN_CSV_PATH, parquet_path=CLEAN_PARQUET_PATH):
+    """
+    Fingerprints the data artifact the loader would read from its file paths,
+    sizes and modification times. Caches keyed on it are invalidated when the
+    cleaning script rewrites or appends to the artifact.
+    """
+    if parquet_available(parquet_path):
+        files = sorted(glob.glob(os.path.join(parquet_path, "**", "*.parquet"), recursive=True))
+    else:
+        files = [csv_path]
+    digest = hashlib.sha1()
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+# --- Parquet Artifact ---
+# Row groups are the unit of work of the parallel aggregate build, so they are
+# kept small enough that one year splits into several tasks.
+PARQUET_ROW_GROUP_ROWS = 100_000
+
+
+def typed_artifact_frame(clean_df):
+    """Converts cleaned rows to the artifact's column types, with free text stored as strings."""
+    typed = apply_dataset_types(clean_df.copy())
+    # Free-text columns may mix numbers and strings; store them as strings
+    for col in typed.select_dtypes(include="object").columns:
+        typed[col] = typed[col].astype("string")
+    return typed
+
+
+def write_parquet_artifact(clean_df, batch, path=CLEAN_PARQUET_PATH, replace=True):
+    """
+    Writes the cleaned data as a Parquet dataset partitioned by year, with typed
+    columns and a pre-parsed 'reported_date', so the app can skip CSV parsing.
+    Each call writes one part file per year named after its ingest batch.
+    """
+    if pyarrow is None:
+        print("pyarrow is not installed; skipping the Parquet artifact.")
+        return
+    typed = typed_artifact_frame(clean_df)
+    if replace and os.path.exists(path):
+        shutil.rmtree(path)
+    for year, year_rows in typed.groupby(typed["reported_date"].dt.year):
+        part_dir = os.path.join(path, f"year={year}")
+        os.makedirs(part_dir, exist_ok=True)
+        year_rows.to_parquet(os.path.join(part_dir, f"part-{batch}.parquet"), index=False,
+                             row_group_size=PARQUET_ROW_GROUP_ROWS)
+
+
+def artifact_table(frame):
+    """
+    Converts typed rows to an Arrow table whose schema doesn't depend on the
+    values in this particular chunk: dictionary columns use int32 indices and
+    all-missing columns are stored as strings.
+    """
+    import pyarrow as pa
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    fields = []
+    for field in table.schema:
+        if pa.types.is_dictionary(field.type):
+            field = field.with_type(pa.dictionary(pa.int32(), pa.string()))
+        elif pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return table.cast(pa.schema(fields))
+
+
+def append_parquet_artifact(writers, clean_df, batch, path=CLEAN_PARQUET_PATH):
+    """
+    Appends a chunk of cleaned rows to the year-partitioned artifact through one
+    open ParquetWriter per year (kept in `writers`), so a streamed batch still
+    produces a single part file per year. Call close_parquet_writers() when done.
+    """
+    if pyarrow is None:
+        return
+    import pyarrow.parquet as pq
+    typed = typed_artifact_frame(clean_df)
+    for year, year_rows in typed.groupby(typed["reported_date"].dt.year):
+        table = artifact_table(year_rows)
+        if year not in writers:
+            part_dir = os.path.join(path, f"year={year}")
+            os.makedirs(part_dir, exist_ok=True)
+            writers[year] = pq.ParquetWriter(os.path.join(part_dir, f"part-{batch}.parquet"), table.schema)
+        writers[year].write_table(table.cast(writers[year].schema), row_group_size=PARQUET_ROW_GROUP_ROWS)
+
+
+def close_parquet_writers(writers):
+    """Closes the per-year writers opened by append_parquet_artifact()."""
+    for writer in writers.values():
+        writer.close()
+    writers.clear()
+
+
+# --- Shared Cached Loader ---
+@st.cache_resource(max_entries=1)
+def _load_dataset_version(version):
+    note_cache_miss()
+    try:
+        return read_clean_data()
+    except FileNotFoundError:
+        st.error(f"Error: Data file not found at {CLEAN_CSV_PATH}")
+        return pd.DataFrame()
+    except Exception as e:
+        st.error(f"An error occurred while loading the data: {e}")
+        return pd.DataFrame()
+
+
+def load_dataset():
+    """
+    Loads the traffic accident data once per dataset version and shares it
+    between pages. The returned frame is shared, so callers must not modify it
+    in place.
+    """
+    with track_cache("load_dataset"):
+        return _load_dataset_version(dataset_version())
@@ -0,0 +1,76 @@
+import pandas as pd
+import numpy as np
+from Data.loader import load_dataset
+from Data.row_index import load_row_index, select_positions
+from Data.spatial_index import load_spatial_index, area_positions
+
+# --- Map Level of Detail ---
+# Above this many points the map shows grid cells instead of raw incidents,
+# which bounds both the payload sent to the browser and its rendering cost.
+MAP_POINT_LIMIT = 5000
+MIN_CELL_DEGREES = 0.0025  # roughly 250 m at Denver's latitude
+METERS_PER_DEGREE = 111_000
+
+
+def bin_points(lat, lon, cell_degrees):
+    """
+    Aggregates points into a square lat/lon grid.
+    Returns one row per non-empty cell with its center and incident count.
+    """
+    iy = np.floor(lat / cell_degrees).astype(np.int64)
+    ix = np.floor(lon / cell_degrees).astype(np.int64)
+    # Flatten (row, column) into one integer key so a 1-D unique does the grouping
+    iy0, ix0 = iy.min(), ix.min()
+    width = ix.max() - ix0 + 1
+    cells, counts = np.unique((iy - iy0) * width + (ix - ix0), return_counts=True)
+    return pd.DataFrame({
+        "lat": (cells // width + iy0 + 0.5) * cell_degrees,
+        "lon": (cells % width + ix0 + 0.5) * cell_degrees,
+        "count": counts,
+    })
+
+
+def grid_layout(lat, lon, limit=MAP_POINT_LIMIT):
+    """
+    Bins points on the finest grid that yields at most `limit` cells and sizes
+    each cell's marker by its count.
+    """
+    cell_degrees = MIN_CELL_DEGREES
+    bins = bin_points(lat, lon, cell_degrees)
+    while len(bins) > limit:
+        cell_degrees *= 2
+        bins = bin_points(lat, lon, cell_degrees)
+    # Marker radius in meters; area grows with the cell's share of the busiest cell
+    half_cell = cell_degrees * METERS_PER_DEGREE / 2
+    bins["size"] = half_cell * np.sqrt(bins["count"] / bins["count"].max())
+    return bins
+
+
+def filtered_positions(start_date, end_date, neighborhoods, area=None, weather=None):
+    """
+    Returns the sorted row positions matching the date range, neighborhoods
+    and the optional area and weather conditions.
+    """
+    positions = select_positions(load_row_index(), start_date, end_date, neighborhoods)
+    if area is not None:
+        positions = np.intersect1d(positions, area_positions(load_spatial_index(), area), assume_unique=True)
+    if weather:
+        conditions = load_dataset()["weather_condition"]
+        wanted = np.flatnonzero(conditions.cat.categories.isin(weather))
+        positions = positions[np.isin(conditions.cat.codes.to_numpy()[positions], wanted)]
+    return positions
+
+
+def map_payload(start_date, end_date, neighborhoods, area=None, weather=None):
+    """
+    Returns the map points for a filter state and whether they were binned.
+    The Dashboard caches the result per filter state in the shared result cache.
+    """
+    df = load_dataset()
+    rows = df.take(filtered_positions(start_date, end_date, neighborhoods, area, weather))
+    # Coordinates are stored as float32; the map needs JSON-friendly float64
+    points = rows[["geo_lat", "geo_lon"]].dropna().astype("float64")
+    points.columns = ["lat", "lon"]
+    if len(points) <= MAP_POINT_LIMIT:
+        return points.reset_index(drop=True), False
+    return grid_layout(points["lat"].to_numpy(), points["lon"].to_numpy()), True
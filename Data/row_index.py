@@ -0,0 +1,68 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from Data.loader import load_dataset, dataset_version
+from Utils.profiling import track_cache, note_cache_miss
+
+# --- Sorted Row Index ---
+# The shared dataset is sorted by 'reported_date', so a date range is a
+# contiguous block of row positions found by binary search. Each neighborhood
+# keeps its own ascending array of row positions, so a query costs
+# O(log n + k) instead of a full-frame boolean mask.
+
+
+def build_row_index(df):
+    """
+    Builds the date array and per-neighborhood row-position arrays for a frame
+    sorted by 'reported_date'.
+    """
+    codes = df["neighborhood_id"].cat.codes.to_numpy()
+    # int32 positions halve the index's memory; the frame stays far below 2**31 rows
+    order = np.argsort(codes, kind="stable").astype(np.int32)
+    bounds = np.searchsorted(codes[order], np.arange(len(df["neighborhood_id"].cat.categories) + 1))
+    positions = {
+        name: order[bounds[code]:bounds[code + 1]]
+        for code, name in enumerate(df["neighborhood_id"].cat.categories)
+    }
+    return {"dates": df["reported_date"].to_numpy(), "positions": positions}
+
+
+def date_range_bounds(row_index, start_date, end_date):
+    """Returns the [lo, hi) row positions covering the inclusive day range."""
+    start = np.datetime64(pd.Timestamp(start_date))
+    end = np.datetime64(pd.Timestamp(end_date) + pd.Timedelta(days=1))
+    lo = np.searchsorted(row_index["dates"], start, side="left")
+    hi = np.searchsorted(row_index["dates"], end, side="left")
+    return lo, hi
+
+
+def select_positions(row_index, start_date, end_date, neighborhoods):
+    """Returns the sorted row positions matching the date range and neighborhoods."""
+    lo, hi = date_range_bounds(row_index, start_date, end_date)
+    parts = []
+    for name in neighborhoods:
+        positions = row_index["positions"].get(name)
+        if positions is None:
+            continue
+        a, b = np.searchsorted(positions, [lo, hi])
+        parts.append(positions[a:b])
+    if not parts:
+        return np.array([], dtype=np.intp)
+    return np.sort(np.concatenate(parts))
+
+
+def filter_rows(df, row_index, start_date, end_date, neighborhoods):
+    """Returns the rows of df matching the date range and neighborhoods, in date order."""
+    return df.take(select_positions(row_index, start_date, end_date, neighborhoods))
+
+
+@st.cache_resource(max_entries=1)
+def _row_index_for_version(version):
+    note_cache_miss()
+    return build_row_index(load_dataset())
+
+
+def load_row_index():
+    """Returns the row index for the current dataset, built once per dataset version."""
+    with track_cache("load_row_index"):
+        return _row_index_for_version(dataset_version())
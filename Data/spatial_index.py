@@ -0,0 +1,115 @@
+import streamlit as st
+import numpy as np
+from Data.loader import load_dataset, dataset_version
+from Utils.profiling import track_cache, note_cache_miss
+
+# --- Spatial Grid Index ---
+# Incidents are bucketed into a fixed lat/lon grid. Row positions are stored
+# grouped by cell, with cells in row-major order, so one row of grid cells is
+# a contiguous block found by binary search. A radius or bounding-box query
+# only visits the cells overlapping its box and then checks those points
+# exactly, instead of scanning every coordinate.
+SPATIAL_CELL_DEGREES = 0.005  # roughly 550 m north-south at Denver's latitude
+EARTH_RADIUS_METERS = 6_371_000
+METERS_PER_DEGREE = np.pi * EARTH_RADIUS_METERS / 180
+
+
+def build_spatial_index(df, cell_degrees=SPATIAL_CELL_DEGREES):
+    """
+    Builds the grid index over the rows of df that have coordinates.
+    The coordinate arrays reference the frame's float32 columns rather than
+    copying them; only candidate rows are widened to float64 at query time.
+    """
+    lat = df["geo_lat"].to_numpy()
+    lon = df["geo_lon"].to_numpy()
+    positions = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon))).astype(np.int32)
+    index = {"cell_degrees": cell_degrees, "lat": lat, "lon": lon}
+    if len(positions) == 0:
+        return {**index, "iy0": 0, "ix0": 0, "width": 1, "height": 0,
+                "cells": np.array([], dtype=np.int64), "starts": np.zeros(1, dtype=np.intp),
+                "positions": positions}
+
+    iy = np.floor(lat[positions].astype(np.float64) / cell_degrees).astype(np.int64)
+    ix = np.floor(lon[positions].astype(np.float64) / cell_degrees).astype(np.int64)
+    iy0, ix0 = iy.min(), ix.min()
+    width = ix.max() - ix0 + 1
+    keys = (iy - iy0) * width + (ix - ix0)
+    order = np.argsort(keys, kind="stable")
+    cells, starts = np.unique(keys[order], return_index=True)
+    return {
+        **index,
+        "iy0": iy0,
+        "ix0": ix0,
+        "width": width,
+        "height": iy.max() - iy0 + 1,
+        "cells": cells,
+        "starts": np.append(starts, len(keys)),
+        "positions": positions[order],
+    }
+
+
+def box_candidates(index, south, west, north, east):
+    """Returns the row positions in every grid cell overlapping the box."""
+    cell = index["cell_degrees"]
+    row_lo = max(int(np.floor(south / cell)) - index["iy0"], 0)
+    row_hi = min(int(np.floor(north / cell)) - index["iy0"], index["height"] - 1)
+    col_lo = max(int(np.floor(west / cell)) - index["ix0"], 0)
+    col_hi = min(int(np.floor(east / cell)) - index["ix0"], index["width"] - 1)
+    parts = []
+    for row in range(row_lo, row_hi + 1):
+        a, b = np.searchsorted(index["cells"], [row * index["width"] + col_lo, row * index["width"] + col_hi + 1])
+        parts.append(index["positions"][index["starts"][a]:index["starts"][b]])
+    if not parts:
+        return np.array([], dtype=np.int32)
+    return np.concatenate(parts)
+
+
+def bbox_positions(index, south, west, north, east):
+    """Returns the sorted row positions inside the bounding box (edges included)."""
+    candidates = box_candidates(index, south, west, north, east)
+    lat = index["lat"][candidates].astype(np.float64)
+    lon = index["lon"][candidates].astype(np.float64)
+    inside = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+    return np.sort(candidates[inside])
+
+
+def radius_positions(index, center_lat, center_lon, meters):
+    """Returns the sorted row positions within `meters` of the center (great-circle distance)."""
+    dlat = meters / METERS_PER_DEGREE
+    dlon = meters / (METERS_PER_DEGREE * max(np.cos(np.radians(center_lat)), 1e-6))
+    candidates = box_candidates(index, center_lat - dlat, center_lon - dlon, center_lat + dlat, center_lon + dlon)
+    lat = np.radians(index["lat"][candidates].astype(np.float64))
+    lon = np.radians(index["lon"][candidates].astype(np.float64))
+    lat0, lon0 = np.radians(center_lat), np.radians(center_lon)
+    # Haversine distance
+    h = np.sin((lat - lat0) / 2) ** 2 + np.cos(lat0) * np.cos(lat) * np.sin((lon - lon0) / 2) ** 2
+    distance = 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+    return np.sort(candidates[distance <= meters])
+
+
+def area_positions(index, area):
+    """
+    Returns the sorted row positions for an area filter:
+    ("radius", lat, lon, meters) or ("bbox", south, west, north, east).
+    """
+    kind, *bounds = area
+    if kind == "radius":
+        return radius_positions(index, *bounds)
+    if kind == "bbox":
+        return bbox_positions(index, *bounds)
+    raise ValueError(f"Unknown area filter: {kind}")
+
+
+@st.cache_resource(max_entries=1)
+def _spatial_index_for_version(version):
+    note_cache_miss()
+    df = load_dataset()
+    if df.empty:
+        return None
+    return build_spatial_index(df)
+
+
+def load_spatial_index():
+    """Returns the spatial index for the current dataset, built once per dataset version."""
+    with track_cache("load_spatial_index"):
+        return _spatial_index_for_version(dataset_version())
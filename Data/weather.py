@@ -0,0 +1,62 @@
+import pandas as pd
+import numpy as np
+import os
+from Data.loader import parse_dates, WEATHER_COLUMNS
+
+# --- Weather Enrichment ---
+# Each incident gets the hourly weather observation nearest to its
+# 'reported_date'. Both sides are sorted by time and joined with one as-of
+# merge, so the cost is a sort plus a linear pass rather than a lookup per
+# incident. Observations further away than WEATHER_TOLERANCE are not used.
+WEATHER_TIME_COLUMN = "observed_at"
+WEATHER_TOLERANCE = pd.Timedelta(minutes=90)
+ASSETS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Assets"))
+DEFAULT_WEATHER_PATHS = [
+    os.path.join(ASSETS_DIR, "Denver_Weather_Hourly.parquet"),
+    os.path.join(ASSETS_DIR, "Denver_Weather_Hourly.csv"),
+]
+
+
+def find_weather_file(path=None):
+    """Returns the weather file to use: the given path, or the first default that exists."""
+    if path:
+        return path
+    return next((candidate for candidate in DEFAULT_WEATHER_PATHS if os.path.exists(candidate)), None)
+
+
+def read_weather(path):
+    """
+    Reads hourly observations (CSV or Parquet) with an 'observed_at' timestamp
+    and any of the weather columns, sorted by time with duplicate hours dropped.
+    """
+    columns = [WEATHER_TIME_COLUMN] + WEATHER_COLUMNS
+    if path.endswith(".parquet"):
+        weather = pd.read_parquet(path)
+    else:
+        weather = pd.read_csv(path, usecols=lambda col: col in columns)
+    weather = weather[[col for col in columns if col in weather.columns]]
+    weather[WEATHER_TIME_COLUMN], _ = parse_dates(weather[WEATHER_TIME_COLUMN])
+    weather = weather.dropna(subset=[WEATHER_TIME_COLUMN])
+    weather = weather.sort_values(WEATHER_TIME_COLUMN, kind="stable")
+    return weather.drop_duplicates(subset=WEATHER_TIME_COLUMN, keep="last").reset_index(drop=True)
+
+
+def enrich_with_weather(clean_df, weather):
+    """
+    Adds the weather columns to clean_df from the nearest observation in time.
+    Rows keep their original order; rows without a parsable date or a nearby
+    observation get missing weather values.
+    """
+    clean_df = clean_df.drop(columns=WEATHER_COLUMNS, errors="ignore")
+    reported, _ = parse_dates(clean_df["reported_date"])
+    incidents = pd.DataFrame({"reported_at": reported.to_numpy(), "row": np.arange(len(clean_df))})
+    incidents = incidents.dropna(subset=["reported_at"]).sort_values("reported_at", kind="stable")
+    observations = weather.rename(columns={WEATHER_TIME_COLUMN: "reported_at"})
+    # merge_asof needs matching datetime resolutions on both keys
+    observations["reported_at"] = observations["reported_at"].astype(incidents["reported_at"].dtype)
+
+    joined = pd.merge_asof(incidents, observations, on="reported_at",
+                           direction="nearest", tolerance=WEATHER_TOLERANCE)
+    enriched = joined.set_index("row").drop(columns="reported_at").reindex(np.arange(len(clean_df)))
+    enriched.index = clean_df.index
+    return pd.concat([clean_df, enriched], axis=1)
@@ -1,18 +1,55 @@
 import streamlit as st
-from PIL import Image
+from PIL import Image, features
 import os
+import io
 import base64
 
+# --- Profile Picture Asset Pipeline ---
+# The source photo is a 5K image; only a display-sized copy is sent to browsers.
+PROFILE_IMAGE_WIDTH = 640  # about 2x the rendered width, for high-DPI screens
+
+
+def build_image_variant(path, width=PROFILE_IMAGE_WIDTH):
+    """
+    Resizes and recompresses an image for display, preferring WebP and falling
+    back to JPEG. The variant is written next to the source so other processes
+    can reuse it. Returns (mime type, encoded bytes).
+    """
+    fmt, mime, ext = ("WEBP", "image/webp", "webp") if features.check("webp") else ("JPEG", "image/jpeg", "jpg")
+    root, _ = os.path.splitext(path)
+    variant_path = f"{root}-{width}w.{ext}"
+
+    # Reuse a variant that is newer than its source
+    if os.path.exists(variant_path) and os.path.getmtime(variant_path) >= os.path.getmtime(path):
+        with open(variant_path, "rb") as f:
+            return mime, f.read()
+
+    with Image.open(path) as image:
+        image = image.convert("RGB")
+        image.thumbnail((width, width))
+        buffer = io.BytesIO()
+        image.save(buffer, format=fmt, quality=80, optimize=True)
+    data = buffer.getvalue()
+    try:
+        with open(variant_path, "wb") as f:
+            f.write(data)
+    except OSError:
+        pass  # A read-only deployment still gets the in-process cache
+    return mime, data
+
+
+@st.cache_resource
+def get_image_data_uri(path, modified_time):
+    """Returns the display-sized image as a data URI, encoded once per source version."""
+    mime, data = build_image_variant(path)
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
 def render_about_me():
     st.title("About Me")
 
     # --- Top Section Container ---
     with st.container():
-        def get_image_as_base64(path):
-            with open(path, "rb") as f:
-                data = f.read()
-            return base64.b64encode(data).decode()
-
         base_path = os.path.dirname(__file__)
         project_root = os.path.join(base_path, "..")
         image_path = os.path.join(project_root, "Assets", "cubes-3d-abstract-5k-wu.jpg")
@@ -21,12 +58,12 @@ def render_about_me():
 
         with col_img:
             try:
-                image_base64 = get_image_as_base64(image_path)
+                image_uri = get_image_data_uri(image_path, os.path.getmtime(image_path))
                 
                 st.markdown(
                     f"""
                     <div class="profile-picture-container">
-                        <img src="data:image/jpeg;base64,{image_base64}" class="profile-picture" alt="Profile picture of the portfolio owner">
+                        <img src="{image_uri}" class="profile-picture" alt="Profile picture of the portfolio owner">
                     </div>
                     """,
                     unsafe_allow_html=True
@@ -1,79 +1,207 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import os
+import pydeck as pdk
 from datetime import datetime, date
+from Data.loader import load_dataset, dataset_version
+from Data.aggregates import load_daily_cube, summarize_cube, summarize_rows
+from Data.map_bins import map_payload, filtered_positions
+from Data.hotspots import hotspot_payload
+from Data.forecast import load_predictions
+from Utils.profiling import span, track_cache, profile_fragment
+from Utils.result_cache import get_result_cache, filter_key
+from Utils.warmup import wait_for_warmup
 
-# --- Data Loading and Caching ---
-@st.cache_data
-def load_data():
-    """
-    Loads, cleans, and caches the traffic accident data.
-    Converts 'reported_date' to datetime objects.
-    """
-    base_path = os.path.dirname(__file__)
-    project_root = os.path.join(base_path, "..")
-    data_path = os.path.join(project_root, "Data", "Denver_Traffic_Clean.csv")
-    
-    try:
-        df = pd.read_csv(data_path)
-        df["reported_date"] = pd.to_datetime(df["reported_date"], errors='coerce')
-        df.dropna(subset=["reported_date"], inplace=True)
-        # Ensure injury/fatality columns are numeric
-        df['SERIOUSLY_INJURED'] = pd.to_numeric(df['SERIOUSLY_INJURED'], errors='coerce').fillna(0)
-        df['FATALITIES'] = pd.to_numeric(df['FATALITIES'], errors='coerce').fillna(0)
-        return df
-    except FileNotFoundError:
-        st.error(f"Error: Data file not found at {data_path}")
-        return pd.DataFrame()
-    except Exception as e:
-        st.error(f"An error occurred while loading the data: {e}")
-        return pd.DataFrame()
+# --- Area Filter Defaults ---
+# Colfax Ave & Broadway, downtown Denver
+DEFAULT_AREA_CENTER = (39.7400, -104.9874)
+DEFAULT_RADIUS_METERS = 500
+AREA_MODES = ["Anywhere", "Within radius", "Bounding box"]
 
-# --- Main Render Function ---
-def render_dashboard():
-    """
-    Renders the entire interactive dashboard page.
-    """
-    st.title("Denver Traffic Accidents Dashboard")
 
-    df = load_data()
-    if df.empty:
-        st.warning("Dashboard cannot be displayed because the data could not be loaded.")
-        return
+# --- Shared Results ---
+@st.cache_data(max_entries=1)
+def neighborhood_options(_df, version):
+    """Sorted neighborhood names for the filter, computed once per dataset version."""
+    # neighborhood_id is dictionary-encoded at load, so its vocabulary is the sorted option list
+    return _df["neighborhood_id"].cat.categories.astype(str).tolist()
+
+
+@st.cache_data(max_entries=1)
+def weather_options(_df, version):
+    """Weather conditions for the filter, or an empty list if the data wasn't enriched."""
+    if "weather_condition" not in _df.columns:
+        return []
+    return _df["weather_condition"].cat.categories.astype(str).tolist()
+
+
+def default_filters(df, cube, version):
+    """Returns the default filter state: the full date range and the first five neighborhoods."""
+    neighborhoods = neighborhood_options(df, version)
+    return cube["day"].iloc[0].date(), cube["day"].iloc[-1].date(), neighborhoods[:5]
+
+
+def cached_summary(cube, version, start_date, end_date, neighborhoods, weather=None):
+    """KPIs and light condition counts for a filter state, shared across sessions."""
+    return get_result_cache().get_or_compute(
+        filter_key("summary", version, start_date, end_date, neighborhoods, weather),
+        lambda: summarize_cube(cube, start_date, end_date, neighborhoods, weather),
+    )
+
 
+def cached_area_summary(df, version, start_date, end_date, neighborhoods, area, weather=None):
+    """KPIs and light condition counts for a filter state with an area filter, from the spatial index."""
+    return get_result_cache().get_or_compute(
+        filter_key("area_summary", version, start_date, end_date, neighborhoods, area, weather),
+        lambda: summarize_rows(df, filtered_positions(start_date, end_date, neighborhoods, area, weather)),
+    )
+
+
+def cached_map_payload(version, start_date, end_date, neighborhoods, area=None, weather=None):
+    """Map points or grid cells for a filter state, shared across sessions."""
+    return get_result_cache().get_or_compute(
+        filter_key("map", version, start_date, end_date, neighborhoods, area, weather),
+        lambda: map_payload(start_date, end_date, neighborhoods, area, weather),
+    )
+
+
+def cached_hotspots(version, start_date, end_date, neighborhoods, area=None, weather=None):
+    """Ranked hotspots for a filter state, shared across sessions."""
+    return get_result_cache().get_or_compute(
+        filter_key("hotspots", version, start_date, end_date, neighborhoods, area, weather),
+        lambda: hotspot_payload(start_date, end_date, neighborhoods, area, weather),
+    )
+
+
+# --- Incident Map ---
+# Viridis end colors keep incidents and hotspots distinguishable for color-blind viewers
+POINT_COLOR = [68, 1, 84, 160]
+HOTSPOT_COLOR = [253, 231, 37, 110]
+POINT_RADIUS_METERS = 25
+
+
+def incident_map(map_data, is_binned, hotspots):
+    """Builds the map: incidents (or grid cells) with the ranked hotspots drawn on top."""
+    layers = [pdk.Layer(
+        "ScatterplotLayer",
+        data=map_data,
+        get_position=["lon", "lat"],
+        get_radius="size" if is_binned else POINT_RADIUS_METERS,
+        get_fill_color=POINT_COLOR,
+    )]
+    if not hotspots.empty:
+        layers.append(pdk.Layer(
+            "ScatterplotLayer",
+            data=hotspots,
+            get_position=["lon", "lat"],
+            get_radius="radius_m",
+            get_fill_color=HOTSPOT_COLOR,
+            get_line_color=[0, 0, 0],
+            line_width_min_pixels=2,
+            stroked=True,
+            pickable=True,
+        ))
+    view = pdk.ViewState(latitude=float(map_data["lat"].mean()), longitude=float(map_data["lon"].mean()), zoom=10)
+    tooltip = {"text": "Hotspot #{rank}\n{incidents} incidents\n{serious_injuries} serious injuries\n{fatalities} fatalities"}
+    return pdk.Deck(layers=layers, initial_view_state=view, tooltip=tooltip)
+
+
+def forecast_view(predictions, neighborhoods):
+    """Sums the precomputed forecast over the selected neighborhoods into a weekday x hour grid."""
+    selected = predictions[predictions["neighborhood_id"].isin(neighborhoods)]
+    return selected.pivot_table(index="weekday", columns="hour", values="expected_incidents", aggfunc="sum")
+
+
+def area_filter(mode, center_lat, center_lon, radius_meters, south, west, north, east):
+    """Builds the area filter tuple for the selected mode, or None when no area applies."""
+    if mode == "Within radius":
+        return ("radius", center_lat, center_lon, radius_meters)
+    if mode == "Bounding box":
+        return ("bbox", min(south, north), min(west, east), max(south, north), max(west, east))
+    return None
+
+
+# --- Filtered Views ---
+@st.fragment
+@profile_fragment("Dashboard filters")
+def render_filtered_views(df, cube):
+    """
+    Renders the filter form, KPIs and linked visuals. As a fragment, applying
+    new filters reruns only this section, not the app shell or the static
+    narrative below it.
+    """
     # --- Main Page Filters ---
     with st.expander("Dashboard Filters", expanded=True):
-        min_overall_date = df["reported_date"].min().date()
-        max_overall_date = df["reported_date"].max().date()
-        
-        selected_date_range = st.slider(
-            "Select Date Range",
-            min_value=min_overall_date,
-            max_value=max_overall_date,
-            value=(min_overall_date, max_overall_date),
-            format="MM/DD/YYYY"
-        )
-        start_date, end_date = selected_date_range
+        # Widgets inside a form only trigger a rerun when "Apply Filters" is pressed,
+        # so dragging the slider or picking several neighborhoods costs one rerun
+        with st.form("dashboard_filters", border=False):
+            # The cube is sorted by day, so its ends give the overall date range
+            version = dataset_version()
+            min_overall_date, max_overall_date, default_neighborhoods = default_filters(df, cube, version)
 
-        neighborhoods = sorted(df["neighborhood_id"].dropna().unique())
-        selected_neighborhoods = st.multiselect(
-            "Neighborhoods",
-            options=neighborhoods,
-            default=neighborhoods[:5]
-        )
+            selected_date_range = st.slider(
+                "Select Date Range",
+                min_value=min_overall_date,
+                max_value=max_overall_date,
+                value=(min_overall_date, max_overall_date),
+                format="MM/DD/YYYY",
+                key="dashboard_date_range"
+            )
+            start_date, end_date = selected_date_range
 
-    # --- Filtering Logic ---
-    start_datetime = pd.to_datetime(start_date)
-    end_datetime = pd.to_datetime(end_date).replace(hour=23, minute=59, second=59)
+            selected_neighborhoods = st.multiselect(
+                "Neighborhoods",
+                options=neighborhood_options(df, version),
+                default=default_neighborhoods,
+                key="dashboard_neighborhoods"
+            )
+
+            # Weather was joined onto each incident by the cleaning script, so
+            # filtering by it is a plain column filter
+            selected_weather = []
+            if weather_options(df, version):
+                selected_weather = st.multiselect(
+                    "Weather (leave empty for all conditions)",
+                    options=weather_options(df, version),
+                    key="dashboard_weather"
+                )
 
-    filtered_df = df[
-        (df["reported_date"] >= start_datetime) &
-        (df["reported_date"] <= end_datetime) &
-        (df["neighborhood_id"].isin(selected_neighborhoods))
-    ]
+            # Location filters are answered from the spatial grid index
+            area_mode = st.radio("Location", AREA_MODES, horizontal=True, key="dashboard_area_mode")
+            radius_cols = st.columns(3)
+            center_lat = radius_cols[0].number_input(
+                "Center latitude", value=DEFAULT_AREA_CENTER[0], format="%.5f", key="dashboard_center_lat")
+            center_lon = radius_cols[1].number_input(
+                "Center longitude", value=DEFAULT_AREA_CENTER[1], format="%.5f", key="dashboard_center_lon")
+            radius_meters = radius_cols[2].number_input(
+                "Radius (m)", min_value=10, max_value=20000, value=DEFAULT_RADIUS_METERS, step=50,
+                key="dashboard_radius_m")
+            box_cols = st.columns(4)
+            south = box_cols[0].number_input("South", value=39.7300, format="%.5f", key="dashboard_bbox_south")
+            west = box_cols[1].number_input("West", value=-105.0000, format="%.5f", key="dashboard_bbox_west")
+            north = box_cols[2].number_input("North", value=39.7600, format="%.5f", key="dashboard_bbox_north")
+            east = box_cols[3].number_input("East", value=-104.9700, format="%.5f", key="dashboard_bbox_east")
+
+            applied = st.form_submit_button("Apply Filters")
+
+    area = area_filter(area_mode, center_lat, center_lon, radius_meters, south, west, north, east)
+    weather = tuple(sorted(selected_weather)) or None
+    # Filters the user explicitly applied, kept outside the widget keys so the
+    # EDA Gallery's time series can follow them (merely opening the page doesn't)
+    if applied:
+        st.session_state["dashboard_applied_filters"] = (
+            start_date, end_date, tuple(sorted(selected_neighborhoods)), weather)
+
+    # --- Filtering Logic ---
+    # KPIs and the light condition chart are answered from the daily cube (or
+    # the spatial index when a location filter is set), and shared across
+    # sessions through the result cache
+    with span("dashboard.filter_summary"), track_cache("filter_summary"):
+        if area is None:
+            summary = cached_summary(cube, version, start_date, end_date, selected_neighborhoods, weather)
+        else:
+            summary = cached_area_summary(df, version, start_date, end_date, selected_neighborhoods, area, weather)
 
-    if filtered_df.empty:
+    if summary["incidents"] == 0:
         st.warning("No data available for the selected filters. Please expand your selection.")
         return
 
@@ -81,9 +209,10 @@ def render_dashboard():
     st.header("Key Metrics")
     kpi1, kpi2, kpi3 = st.columns(3)
 
-    total_incidents = filtered_df.shape[0]
-    total_serious_injuries = filtered_df['SERIOUSLY_INJURED'].sum()
-    
+    total_incidents = summary["incidents"]
+    total_serious_injuries = summary["serious_injuries"]
+    total_fatalities = summary["fatalities"]
+
     injury_rate = (total_serious_injuries / total_incidents * 100) if total_incidents > 0 else 0
 
     with kpi1:
@@ -99,7 +228,7 @@ def render_dashboard():
     with kpi3:
         st.metric(
             label="Total Fatalities",
-            value=f"{int(filtered_df['FATALITIES'].sum()):,}"
+            value=f"{total_fatalities:,}"
         )
 
     st.write("---")
@@ -110,32 +239,101 @@ def render_dashboard():
 
     with col1:
         st.subheader("Incident Map")
-        map_data = filtered_df[['geo_lat', 'geo_lon']].dropna()
-        map_data.rename(columns={'geo_lat': 'lat', 'geo_lon': 'lon'}, inplace=True)
-        if not map_data.empty:
-            st.map(map_data, zoom=10)
-        else:
-            st.info("No location data to display for the selected filters.")
+        # Large selections are aggregated into grid cells; small ones show raw points
+        with span("dashboard.map_payload"), track_cache("map_payload"):
+            map_data, is_binned = cached_map_payload(version, start_date, end_date, selected_neighborhoods, area, weather)
+        with span("dashboard.hotspots"), track_cache("hotspots"):
+            hotspots = cached_hotspots(version, start_date, end_date, selected_neighborhoods, area, weather)
+        with span("dashboard.map_render"):
+            if map_data.empty:
+                st.info("No location data to display for the selected filters.")
+            else:
+                st.pydeck_chart(incident_map(map_data, is_binned, hotspots))
+                if is_binned:
+                    st.caption(
+                        f"{int(map_data['count'].sum()):,} incidents grouped into {len(map_data):,} grid cells. "
+                        "Narrow the filters to see individual incidents."
+                    )
+                if not hotspots.empty:
+                    st.caption("Yellow circles mark the densest incident clusters, ranked by severity.")
+                    st.dataframe(
+                        hotspots[["rank", "incidents", "serious_injuries", "fatalities", "severity"]].rename(columns={
+                            "rank": "Rank", "incidents": "Incidents", "serious_injuries": "Serious Injuries",
+                            "fatalities": "Fatalities", "severity": "Severity Score",
+                        }),
+                        hide_index=True,
+                        use_container_width=True,
+                    )
 
     with col2:
         st.subheader("Incidents by Light Condition")
-        light_counts = filtered_df["LIGHT_CONDITION"].value_counts().reset_index()
-        light_counts.columns = ["Light Condition", "Incident Count"]
-        
-        fig = px.bar(
-            light_counts,
-            x="Incident Count",
-            y="Light Condition",
-            orientation='h',
-            title="Traffic Incidents by Light Condition",
-            color="Incident Count",
-            color_continuous_scale=px.colors.sequential.Viridis # Viridis is color-blind safe
-        )
-        fig.update_layout(
-            yaxis={'categoryorder':'total ascending'},
-            margin=dict(l=10, r=10, t=40, b=10)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with span("dashboard.light_chart_build"):
+            fig = px.bar(
+                summary["light_counts"],
+                x="Incident Count",
+                y="Light Condition",
+                orientation='h',
+                title="Traffic Incidents by Light Condition",
+                color="Incident Count",
+                color_continuous_scale=px.colors.sequential.Viridis # Viridis is color-blind safe
+            )
+            fig.update_layout(
+                yaxis={'categoryorder':'total ascending'},
+                margin=dict(l=10, r=10, t=40, b=10)
+            )
+        with span("dashboard.light_chart_render"):
+            st.plotly_chart(fig, use_container_width=True)
+
+    st.write("---")
+
+    # --- Forecast Risk ---
+    # Read from the prediction table written by Data/forecast.py; nothing is inferred per rerun
+    st.header("Forecast Risk")
+    predictions = load_predictions()
+    if predictions is None:
+        st.info("No forecast yet. Train one with `python Data/forecast.py`.")
+        return
+    with span("dashboard.forecast_lookup"):
+        grid = forecast_view(predictions, selected_neighborhoods)
+    if grid.empty:
+        st.info("No forecast is available for the selected neighborhoods.")
+        return
+
+    day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    peak_day, peak_hour = grid.stack().idxmax()
+    forecast_week = predictions["forecast_week"].iloc[0]
+    kpi1, kpi2 = st.columns(2)
+    with kpi1:
+        st.metric(label=f"Expected Incidents, Week of {forecast_week:%m/%d/%Y}", value=f"{grid.to_numpy().sum():,.1f}")
+    with kpi2:
+        st.metric(label="Highest-Risk Hour", value=f"{day_names[peak_day]} {peak_hour:02d}:00")
+    fig = px.imshow(
+        grid.rename(index=dict(enumerate(day_names))),
+        labels={"x": "Hour of Day", "y": "Day", "color": "Expected Incidents"},
+        title="Forecast Incidents by Day and Hour (Selected Neighborhoods)",
+        color_continuous_scale=px.colors.sequential.Viridis,
+        aspect="auto",
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("Forecast ignores the date range filter; it covers the week after the latest complete week of data.")
+
+
+# --- Main Render Function ---
+def render_dashboard():
+    """
+    Renders the entire interactive dashboard page.
+    """
+    st.title("Denver Traffic Accidents Dashboard")
+    wait_for_warmup()
+
+    with span("dashboard.load_data"):
+        df = load_dataset()
+        cube = load_daily_cube()
+    if df.empty or cube.empty:
+        st.warning("Dashboard cannot be displayed because the data could not be loaded.")
+        return
+
+    render_filtered_views(df, cube)
 
     st.write("---")
 
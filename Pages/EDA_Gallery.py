@@ -1,40 +1,35 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import os
-
-# --- Helper function to load data ---
-@st.cache_data
-def load_eda_data():
-    base_path = os.path.dirname(__file__)
-    project_root = os.path.join(base_path, "..")
-    data_path = os.path.join(project_root, "Data", "Denver_Traffic_Clean.csv")
-    try:
-        df = pd.read_csv(data_path)
-        df["reported_date"] = pd.to_datetime(df["reported_date"], errors='coerce')
-        df.dropna(subset=["reported_date"], inplace=True)
-        return df
-    except Exception as e:
-        st.error(f"Error loading data for EDA Gallery: {e}")
-        return pd.DataFrame()
+import plotly.graph_objects as go
+from Data.loader import dataset_version
+from Data.aggregates import load_aggregates, histogram_box_stats, daily_series, rollup_series, TIME_GRANULARITIES
+from Utils.profiling import span, track_cache, note_cache_miss, profile_fragment
+from Utils.warmup import wait_for_warmup
 
-# --- Chart Functions ---
-
-def neighborhood_incidents(df):
-    st.subheader("Incidents by Neighborhood")
+# --- Figure Cache ---
+# The dataset only changes when the cleaning script rewrites the artifact, so
+# each chart's figure is cached per dataset version. The figures are built
+# from the precomputed chart aggregates rather than the incident rows. Old
+# versions fall out of the cache as least recently used entries.
+FIGURE_CACHE_ENTRIES = 8
+# The time series is also keyed on granularity, rolling window and the
+# Dashboard filters, so it keeps more entries
+TIME_SERIES_CACHE_ENTRIES = 64
+ROLLING_WINDOWS = [1, 3, 6, 12]
+PERIOD_LABELS = {"Daily": "Day", "Weekly": "Week", "Monthly": "Month", "Yearly": "Year"}
 
-    if "neighborhood_id" not in df.columns:
-        st.error("Column 'neighborhood_id' not found in dataset.")
-        return
 
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def neighborhood_figure(_aggregates, version):
+    note_cache_miss()
     counts = (
-        df["neighborhood_id"]
-        .dropna()
-        .value_counts()
+        _aggregates["neighborhood"]
         .nlargest(15)
-        .reset_index()
-        .rename(columns={"neighborhood_id": "Neighborhood", "count": "Incident Count"})
+        .rename_axis("Neighborhood")
+        .reset_index(name="Incident Count")
     )
+    counts["Neighborhood"] = counts["Neighborhood"].astype(str)
 
     fig = px.bar(
         counts,
@@ -47,7 +42,147 @@ def neighborhood_incidents(df):
     )
 
     fig.update_layout(yaxis={"categoryorder": "total ascending"})
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+@st.cache_data(max_entries=TIME_SERIES_CACHE_ENTRIES)
+def filtered_daily_series(_aggregates, version, filters=None):
+    """Incidents per day for the Dashboard filters (start, end, neighborhoods, weather), or for all data."""
+    note_cache_miss()
+    if filters is None:
+        return daily_series(_aggregates["daily"])
+    return daily_series(_aggregates["daily"], *filters)
+
+
+@st.cache_data(max_entries=TIME_SERIES_CACHE_ENTRIES)
+def incidents_over_time_figure(_aggregates, version, granularity="Monthly", window=1, filters=None):
+    note_cache_miss()
+    # Each granularity is a roll-up of the same cached daily series
+    time_series_df = rollup_series(filtered_daily_series(_aggregates, version, filters), granularity, window)
+    time_series_df = time_series_df.rename_axis('reported_date').reset_index()
+    period = PERIOD_LABELS[granularity]
+
+    fig = px.line(
+        time_series_df,
+        x='reported_date',
+        y='incidents',
+        title=f'{granularity} Traffic Incidents Over Time',
+        labels={'reported_date': period, 'incidents': 'Number of Incidents'}
+    )
+    
+    fig.update_traces(mode='lines+markers' if len(time_series_df) <= 400 else 'lines', name='Incidents', showlegend=True)
+    if window > 1:
+        fig.add_scatter(
+            x=time_series_df['reported_date'],
+            y=time_series_df['rolling'],
+            mode='lines',
+            name=f'{window}-{period.lower()} rolling average',
+            line={'color': px.colors.sequential.Viridis[7], 'width': 3},
+        )
+    return fig
+
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def type_distribution_figure(_aggregates, version):
+    note_cache_miss()
+    type_counts = _aggregates['offense'].nlargest(5).reset_index()
+    type_counts.columns = ['Incident Type', 'Count']
+    type_counts['Incident Type'] = type_counts['Incident Type'].astype(str)
+
+    fig = px.pie(
+        type_counts,
+        names='Incident Type',
+        values='Count',
+        title='Top 5 Most Common Incident Types',
+        hole=0.3,
+        color_discrete_sequence=px.colors.qualitative.Safe # Explicitly use a color-blind safe palette
+    )
+    
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def incident_hour_by_day_figure(_aggregates, version):
+    note_cache_miss()
+    # Box statistics come from a 7x24 count histogram, so the figure holds one
+    # summary per weekday instead of every incident row
+    counts = _aggregates["hour_weekday"]
+    day_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    colors = px.colors.qualitative.Safe # Explicitly use a color-blind safe palette
+
+    fig = go.Figure()
+    for day_index, day in enumerate(day_order):
+        stats = histogram_box_stats(counts[day_index])
+        if stats is None:
+            continue
+        color = colors[day_index % len(colors)]
+        fig.add_trace(go.Box(
+            x=[day],
+            q1=[stats["q1"]],
+            median=[stats["median"]],
+            q3=[stats["q3"]],
+            lowerfence=[stats["lowerfence"]],
+            upperfence=[stats["upperfence"]],
+            name=day,
+            marker_color=color,
+        ))
+        if len(stats["outliers"]):
+            fig.add_trace(go.Scatter(
+                x=[day] * len(stats["outliers"]),
+                y=stats["outliers"],
+                mode="markers",
+                name=day,
+                marker_color=color,
+                customdata=stats["outlier_counts"],
+                hovertemplate="%{y}:00 - %{customdata} incidents<extra></extra>",
+            ))
+
+    fig.update_layout(
+        title='Distribution of Incident Hour by Day',
+        xaxis_title='Day of the Week',
+        yaxis_title='Hour of Day (24-hour format)',
+        xaxis={"categoryorder": "array", "categoryarray": day_order},
+        showlegend=False,
+    )
+    return fig
+
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES)
+def weather_figure(_aggregates, version):
+    note_cache_miss()
+    weather = pd.DataFrame({
+        "Weather": _aggregates["weather"].index.astype(str),
+        "Incident Count": _aggregates["weather"].to_numpy(),
+        "Serious Injuries": _aggregates["weather_serious"].reindex(_aggregates["weather"].index).to_numpy(),
+    })
+    weather = weather[weather["Incident Count"] > 0]
+    weather["Serious Injury Rate (%)"] = weather["Serious Injuries"] / weather["Incident Count"] * 100
+
+    fig = px.bar(
+        weather,
+        x="Incident Count",
+        y="Weather",
+        orientation="h",
+        title="Traffic Incidents by Weather Condition",
+        color="Serious Injury Rate (%)",
+        color_continuous_scale=px.colors.sequential.Viridis,
+        hover_data={"Serious Injuries": True},
+    )
+
+    fig.update_layout(yaxis={"categoryorder": "total ascending"})
+    return fig
+
+
+# --- Chart Functions ---
+
+def neighborhood_incidents(aggregates, version):
+    st.subheader("Incidents by Neighborhood")
+
+    with span("eda.neighborhood_figure"), track_cache("neighborhood_figure"):
+        fig = neighborhood_figure(aggregates, version)
+    with span("eda.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
 
     left, right = st.columns(2)
     with left:
@@ -70,30 +205,49 @@ def neighborhood_incidents(df):
         )
 
 
-def incidents_over_time(df):
+@st.fragment
+@profile_fragment("Incidents Over Time")
+def incidents_over_time(aggregates, version):
+    """
+    Renders the time series with its granularity and rolling-average controls.
+    As a fragment, changing a control reruns only this chart.
+    """
     st.subheader("Incidents Over Time")
-    
-    time_series_df = df.set_index('reported_date').resample('ME').size().reset_index(name='Incident Count')
 
-    fig = px.line(
-        time_series_df,
-        x='reported_date',
-        y='Incident Count',
-        title='Monthly Traffic Incidents Over Time',
-        labels={'reported_date': 'Month', 'Incident Count': 'Number of Incidents'}
-    )
-    
-    fig.update_traces(mode='lines+markers')
-    st.plotly_chart(fig, use_container_width=True)
+    # Filters applied on the Dashboard carry over (the area filter is row-level and does not)
+    filters = st.session_state.get("dashboard_applied_filters")
+    if filters is not None:
+        start_date, end_date, neighborhoods, weather = filters
+        if st.toggle("Follow the Dashboard filters", value=True, key="eda_follow_dashboard_filters"):
+            st.caption(
+                f"Showing the Dashboard filters: {start_date:%m/%d/%Y} - {end_date:%m/%d/%Y}, "
+                f"{len(neighborhoods)} neighborhood(s)" + (f", weather: {', '.join(weather)}" if weather else "") + "."
+            )
+        else:
+            filters = None
+
+    left, right = st.columns(2)
+    with left:
+        granularity = st.radio(
+            "Granularity", list(TIME_GRANULARITIES), index=2, horizontal=True, key="eda_time_granularity")
+    with right:
+        window = st.selectbox(
+            "Rolling average (periods)", ROLLING_WINDOWS,
+            format_func=lambda periods: "Off" if periods == 1 else str(periods), key="eda_time_window")
+
+    with span("eda.incidents_over_time_figure"), track_cache("incidents_over_time_figure"):
+        fig = incidents_over_time_figure(aggregates, version, granularity, window, filters)
+    with span("eda.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
 
     left, right = st.columns(2)
     with left:
         st.subheader("How to Read This Chart")
         st.markdown(
             """
-            - **Y-axis:** Total number of incidents recorded in a given month.
-            - **X-axis:** Timeline showing the progression of months.
-            - **Line:** Represents the trend of incidents over the selected period.
+            - **Y-axis:** Total number of incidents recorded in each day, week, month or year.
+            - **X-axis:** Timeline showing the progression of the chosen periods.
+            - **Line:** Represents the trend of incidents over the selected period; the optional rolling average smooths it over several periods.
             """
         )
     with right:
@@ -106,23 +260,13 @@ def incidents_over_time(df):
         )
 
 
-def type_distribution(df):
+def type_distribution(aggregates, version):
     st.subheader("Incident Type Distribution")
-    
-    type_counts = df['top_traffic_accident_offense'].value_counts().nlargest(5).reset_index()
-    type_counts.columns = ['Incident Type', 'Count']
 
-    fig = px.pie(
-        type_counts,
-        names='Incident Type',
-        values='Count',
-        title='Top 5 Most Common Incident Types',
-        hole=0.3,
-        color_discrete_sequence=px.colors.qualitative.Safe # Explicitly use a color-blind safe palette
-    )
-    
-    fig.update_traces(textposition='inside', textinfo='percent+label')
-    st.plotly_chart(fig, use_container_width=True)
+    with span("eda.type_distribution_figure"), track_cache("type_distribution_figure"):
+        fig = type_distribution_figure(aggregates, version)
+    with span("eda.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
 
     left, right = st.columns(2)
     with left:
@@ -143,28 +287,13 @@ def type_distribution(df):
         )
 
 
-def incident_hour_by_day(df):
+def incident_hour_by_day(aggregates, version):
     st.subheader("Distribution of Incident Hour by Day of the Week")
 
-    plot_df = df.copy()
-    plot_df['hour'] = plot_df['reported_date'].dt.hour
-    plot_df['day_of_week'] = plot_df['reported_date'].dt.day_name()
-
-    day_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    
-    fig = px.box(
-        plot_df,
-        x='day_of_week',
-        y='hour',
-        color='day_of_week',
-        category_orders={"day_of_week": day_order},
-        title='Distribution of Incident Hour by Day',
-        labels={'day_of_week': 'Day of the Week', 'hour': 'Hour of Day (24-hour format)'},
-        color_discrete_sequence=px.colors.qualitative.Safe # Explicitly use a color-blind safe palette
-    )
-    
-    fig.update_layout(showlegend=False)
-    st.plotly_chart(fig, use_container_width=True)
+    with span("eda.incident_hour_by_day_figure"), track_cache("incident_hour_by_day_figure"):
+        fig = incident_hour_by_day_figure(aggregates, version)
+    with span("eda.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
 
     left, right = st.columns(2)
     with left:
@@ -186,25 +315,63 @@ def incident_hour_by_day(df):
         )
 
 
+def weather_conditions(aggregates, version):
+    st.subheader("Incidents by Weather Condition")
+
+    if "weather" not in aggregates:
+        st.info("Weather data is not available. Add an hourly weather file and re-run Data/Denver_Traffic_EDA.py.")
+        return
+
+    with span("eda.weather_figure"), track_cache("weather_figure"):
+        fig = weather_figure(aggregates, version)
+    with span("eda.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+    left, right = st.columns(2)
+    with left:
+        st.subheader("How to Read This Chart")
+        st.markdown(
+            """
+            - **Y-axis:** Weather at the nearest hourly observation to each incident.
+            - **X-axis:** Total number of recorded incidents.
+            - **Color:** Share of incidents with a serious injury.
+            """
+        )
+    with right:
+        st.subheader("Insights")
+        st.markdown(
+            """
+            - **Exposure:** Clear weather is the most common condition, so it naturally accounts for the most incidents.
+            - **Severity:** Compare the color of each bar to see whether incidents in rain, snow or fog tend to be more severe.
+            """
+        )
+
+
 def render_eda_gallery():
     st.title("Exploratory Data Analysis (EDA) Gallery")
     st.write("This gallery presents several visualizations to explore the Denver traffic accident dataset from different perspectives.")
+    wait_for_warmup()
     
-    df = load_eda_data()
-    if df.empty:
+    with span("eda.load_aggregates"):
+        aggregates = load_aggregates()
+    if aggregates is None:
         return
+    version = dataset_version()
 
     st.write("---")
-    neighborhood_incidents(df)
+    neighborhood_incidents(aggregates, version)
     
     st.write("---")
-    incidents_over_time(df)
+    incidents_over_time(aggregates, version)
     
     st.write("---")
-    type_distribution(df)
+    type_distribution(aggregates, version)
     
     st.write("---")
-    incident_hour_by_day(df)
+    incident_hour_by_day(aggregates, version)
+
+    st.write("---")
+    weather_conditions(aggregates, version)
 
     st.write("---")
     with st.container(border=True):
@@ -0,0 +1,26 @@
+import importlib
+import threading
+import time
+
+# --- Lazy Page Loading ---
+# Page modules (and the pandas/plotly imports of the data pages) are imported
+# the first time a page is opened instead of at app startup.
+PAGE_IMPORT_TIMES = {}
+_import_lock = threading.Lock()
+
+
+def load_page_renderer(module_name, function_name):
+    """
+    Imports a page module on first use and returns its render function.
+    The first import of each module is timed and reported once per process.
+    Concurrent sessions wait for an in-progress import instead of seeing a
+    partially initialized module.
+    """
+    if module_name not in PAGE_IMPORT_TIMES:
+        with _import_lock:
+            if module_name not in PAGE_IMPORT_TIMES:
+                start = time.perf_counter()
+                importlib.import_module(module_name)
+                PAGE_IMPORT_TIMES[module_name] = (time.perf_counter() - start) * 1000
+                print(f"[startup] Imported {module_name} in {PAGE_IMPORT_TIMES[module_name]:.1f} ms")
+    return getattr(importlib.import_module(module_name), function_name)
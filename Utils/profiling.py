@@ -0,0 +1,169 @@
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# --- Opt-in Rerun Profiling ---
+# Enabled with STREAMLIT_PORTFOLIO_PROFILE=1 or the ?profile=1 query parameter.
+# Each rerun records named spans and loader cache hits/misses, shows them in a
+# panel under the page and appends them to a JSON-lines log file. A fragment
+# that reruns on its own (without app.py) is profiled as its own rerun.
+PROFILE_ENV = "STREAMLIT_PORTFOLIO_PROFILE"
+PROFILE_LOG_ENV = "STREAMLIT_PORTFOLIO_PROFILE_LOG"
+DEFAULT_PROFILE_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "profile_spans.jsonl")
+
+_cache_state = threading.local()
+_log_lock = threading.Lock()
+
+
+def _current_rerun():
+    # Only script threads have a session; warm-up and benchmark threads don't
+    if get_script_run_ctx() is None:
+        return None
+    return st.session_state.get("_profile_rerun")
+
+
+def profiling_enabled():
+    """Returns True when profiling is switched on by env var or query parameter."""
+    if os.environ.get(PROFILE_ENV, "") not in ("", "0"):
+        return True
+    return st.query_params.get("profile") == "1"
+
+
+def start_rerun(page, fragment=None):
+    """Starts a new rerun record; call once at the top of the app script."""
+    if not profiling_enabled():
+        st.session_state.pop("_profile_rerun", None)
+        return
+    st.session_state["_profile_rerun"] = {
+        "page": page,
+        "fragment": fragment,
+        "started": time.perf_counter(),
+        "depth": 0,
+        "spans": [],
+        "cache": [],
+    }
+
+
+def is_fragment_rerun():
+    """Returns True when only fragments are rerunning, so app.py's start/end hooks don't run."""
+    ctx = get_script_run_ctx()
+    return ctx is not None and bool(ctx.fragment_ids_this_run)
+
+
+def profile_fragment(name):
+    """
+    Decorates a fragment's function (below @st.fragment). When the fragment
+    reruns on its own, its spans go into a fresh rerun record and the panel is
+    shown and logged at the end of the fragment. Inside a full rerun the
+    fragment's spans simply belong to the app's record.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_fragment_rerun():
+                return func(*args, **kwargs)
+            start_rerun(st.session_state.get("page"), fragment=name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                render_profile_panel()
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def span(name):
+    """Times the enclosed block as a named span of the current rerun."""
+    rerun = _current_rerun()
+    if rerun is None:
+        yield
+        return
+    entry = {"name": name, "depth": rerun["depth"], "ms": None}
+    rerun["spans"].append(entry)
+    rerun["depth"] += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry["ms"] = (time.perf_counter() - start) * 1000
+        rerun["depth"] -= 1
+
+
+@contextlib.contextmanager
+def track_cache(name):
+    """
+    Records whether a cached loader call was a hit or a miss. The cached
+    function body calls note_cache_miss(), which only runs on a miss.
+    """
+    previous = getattr(_cache_state, "missed", None)
+    _cache_state.missed = False
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        rerun = _current_rerun()
+        if rerun is not None:
+            rerun["cache"].append({
+                "name": name,
+                "hit": not _cache_state.missed,
+                "ms": (time.perf_counter() - start) * 1000,
+            })
+        _cache_state.missed = previous
+
+
+def note_cache_miss():
+    """Marks the innermost tracked cache call as a miss."""
+    _cache_state.missed = True
+
+
+def render_profile_panel():
+    """Shows the current rerun's breakdown and appends it to the profile log."""
+    rerun = _current_rerun()
+    if rerun is None:
+        return
+    total_ms = (time.perf_counter() - rerun["started"]) * 1000
+    from Utils.result_cache import get_result_cache
+    cache_stats = get_result_cache().stats()
+
+    label = f"Fragment rerun profile ({rerun['fragment']})" if rerun["fragment"] else "Rerun profile"
+    with st.expander(f"{label}: {total_ms:.1f} ms", expanded=False):
+        st.markdown("**Spans**")
+        st.code(
+            "\n".join(
+                f"{'  ' * s['depth']}{s['name']:<{40 - 2 * s['depth']}} {s['ms'] or 0:>9.1f} ms"
+                for s in rerun["spans"]
+            ) or "(no spans)"
+        )
+        st.markdown("**Result cache**")
+        st.code(
+            "hits {hits}  misses {misses}  waits {waits}  hit rate {hit_rate:.0%}  entries {entries}  "
+            "{mb:.1f} / {max_mb:.0f} MB  evictions {evictions}".format(
+                mb=cache_stats["bytes"] / 2**20, max_mb=cache_stats["max_bytes"] / 2**20, **cache_stats
+            )
+        )
+        st.markdown("**Loader cache**")
+        st.code(
+            "\n".join(
+                f"{c['name']:<40} {'hit ' if c['hit'] else 'MISS'} {c['ms']:>9.1f} ms"
+                for c in rerun["cache"]
+            ) or "(no cached loader calls)"
+        )
+
+    record = {
+        "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+        "page": rerun["page"],
+        "fragment": rerun["fragment"],
+        "total_ms": total_ms,
+        "spans": [{k: s[k] for k in ("name", "depth", "ms")} for s in rerun["spans"]],
+        "cache": rerun["cache"],
+        "result_cache": cache_stats,
+    }
+    with _log_lock:
+        with open(os.environ.get(PROFILE_LOG_ENV, DEFAULT_PROFILE_LOG), "a") as f:
+            f.write(json.dumps(record) + "\n")
@@ -0,0 +1,121 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from Utils.profiling import note_cache_miss
+
+# --- Cross-Session Result Cache ---
+# Filtered aggregates and map payloads are shared by every session in the
+# process, keyed on normalized filter state, and held under a byte budget with
+# least-recently-used eviction. Concurrent misses on the same key are computed
+# once: later callers wait for the first caller's result.
+CACHE_BUDGET_ENV = "DASHBOARD_CACHE_MB"
+DEFAULT_CACHE_MB = 256
+
+
+def estimate_nbytes(value):
+    """Roughly estimates the memory held by a cached value."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def filter_key(kind, version, start_date, end_date, neighborhoods, *extra):
+    """Builds a normalized cache key so equivalent filter states share an entry."""
+    return (kind, version, str(start_date), str(end_date), tuple(sorted(set(neighborhoods)))) + extra
+
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by the estimated size of its values."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached value for key, computing and storing it on a miss.
+        A caller that misses while another caller is computing the same key
+        waits for that result instead of computing it again.
+        """
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = Future()
+                    self.misses += 1
+                    break
+                self.waits += 1
+            # If the first caller failed, retry (and compute) as a fresh lookup
+            if pending.exception() is None:
+                return pending.result()
+        note_cache_miss()
+
+        # Computed outside the lock so slow misses don't block other sessions
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            pending.set_exception(e)
+            raise
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            del self._pending[key]
+            if nbytes <= self.max_bytes:
+                self._entries[key] = (value, nbytes)
+                self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+        pending.set_result(value)
+        return value
+
+    def stats(self):
+        """
+        Returns hit/miss counts, hit rate and memory use. Callers that waited
+        for another caller's computation count as 'waits', not misses.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.waits
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.waits) / lookups if lookups else 0.0,
+            }
+
+
+@st.cache_resource
+def get_result_cache():
+    """Returns the process-wide result cache, sized by DASHBOARD_CACHE_MB."""
+    budget_mb = float(os.environ.get(CACHE_BUDGET_ENV, DEFAULT_CACHE_MB))
+    return ResultCache(int(budget_mb * 1024 * 1024))
@@ -0,0 +1,86 @@
+import streamlit as st
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# --- Background Warm-Up ---
+# Started once per process on the first script run (usually the landing page,
+# which needs no data). Loads the dataset and fills the loader, result and
+# figure caches off the request path, so the first Dashboard or EDA Gallery
+# visit after a deploy doesn't pay for parsing and aggregation.
+WARMUP_WORKERS = 4
+
+
+def run_warmup(pool):
+    """Loads the dataset, then builds the default Dashboard view and EDA figures in parallel."""
+    from Pages import load_page_renderer
+    from Data.loader import load_dataset, dataset_version
+    from Data.aggregates import load_daily_cube, load_aggregates
+    from Data.row_index import load_row_index
+    from Data.spatial_index import load_spatial_index
+
+    start = time.perf_counter()
+    df = load_dataset()
+    if df.empty:
+        return
+    version = dataset_version()
+
+    # Importing through the router's loader keeps the page import timings
+    load_page_renderer("Pages.Dashboard", "render_dashboard")
+    load_page_renderer("Pages.EDA_Gallery", "render_eda_gallery")
+    dashboard, eda_gallery = sys.modules["Pages.Dashboard"], sys.modules["Pages.EDA_Gallery"]
+
+    cube_future = pool.submit(load_daily_cube)
+    index_future = pool.submit(load_row_index)
+    spatial_future = pool.submit(load_spatial_index)
+    aggregates = load_aggregates()
+    figure_futures = [
+        pool.submit(builder, aggregates, version)
+        for builder in (
+            eda_gallery.neighborhood_figure,
+            eda_gallery.type_distribution_figure,
+            eda_gallery.incident_hour_by_day_figure,
+        )
+    ]
+    # Same arguments as the page's default view (monthly, no rolling average,
+    # no Dashboard filters); cache_data keys on the arguments actually passed
+    figure_futures.append(pool.submit(eda_gallery.incidents_over_time_figure, aggregates, version, "Monthly", 1, None))
+    if "weather" in aggregates:
+        figure_futures.append(pool.submit(eda_gallery.weather_figure, aggregates, version))
+
+    cube = cube_future.result()
+    index_future.result()
+    spatial_future.result()
+    start_date, end_date, neighborhoods = dashboard.default_filters(df, cube, version)
+    view_futures = [
+        pool.submit(dashboard.cached_summary, cube, version, start_date, end_date, neighborhoods),
+        pool.submit(dashboard.cached_map_payload, version, start_date, end_date, neighborhoods),
+        pool.submit(dashboard.cached_hotspots, version, start_date, end_date, neighborhoods),
+    ]
+    for future in figure_futures + view_futures:
+        future.result()
+    print(f"[startup] Warm-up finished in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+@st.cache_resource
+def start_warmup():
+    """Starts the warm-up once per process and returns its future."""
+    pool = ThreadPoolExecutor(max_workers=WARMUP_WORKERS, thread_name_prefix="warmup")
+    # The coordinating task runs on its own thread so it never waits on a pool
+    # slot it is occupying itself
+    coordinator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warmup-main")
+    return coordinator.submit(run_warmup, pool)
+
+
+def wait_for_warmup():
+    """
+    Shows a lightweight placeholder while warm-up is still running. Returns
+    once it finishes; if warm-up failed, the page computes its own data.
+    """
+    future = start_warmup()
+    if future.done():
+        return
+    with st.spinner("Preparing the dataset and charts..."):
+        wait([future])
+    if future.exception() is not None:
+        print(f"[startup] Warm-up failed: {future.exception()}")
@@ -4,24 +4,29 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import streamlit as st
 
-# Import render functions from the pages directory
-from Pages.Home import render_home
-from Pages.About_me import render_about_me
-from Pages.EDA_Gallery import render_eda_gallery
-from Pages.Dashboard import render_dashboard
-from Pages.Future_Work import render_future_work
+# Page modules are imported lazily, on first visit
+from Pages import load_page_renderer
+from Utils.profiling import start_rerun, span, render_profile_panel
+from Utils.warmup import start_warmup
 
 # --- Page Setup ---
 st.set_page_config(page_title="Streamlit Portfolio", layout="wide")
 
+# Load data and precompute the data pages in the background, once per process
+start_warmup()
+
 # --- Session State Initialization ---
 if "sidebar_open" not in st.session_state:
     st.session_state.sidebar_open = True
 if "page" not in st.session_state:
     st.session_state.page = "Home"  # Default page is now "Home"
 
+# Opt-in per-rerun timing (STREAMLIT_PORTFOLIO_PROFILE=1 or ?profile=1)
+start_rerun(st.session_state.page)
+
 # --- Custom CSS ---
-st.markdown("""
+with span("app.css_injection"):
+    st.markdown("""
 <style>
     /* Hides the default Streamlit hamburger menu */
     button[title="View fullscreen"] {
@@ -208,16 +213,21 @@ with sidebar_col:
             st.rerun()
 
 # --- Page Rendering Dictionary ---
+# Maps each page to its (module, render function); modules load on first use
 page_renderer = {
-    "Home": render_home,
-    "About Me": render_about_me,
-    "EDA Gallery": render_eda_gallery,
-    "Dashboard": render_dashboard,
-    "Future Work": render_future_work,
+    "Home": ("Pages.Home", "render_home"),
+    "About Me": ("Pages.About_me", "render_about_me"),
+    "EDA Gallery": ("Pages.EDA_Gallery", "render_eda_gallery"),
+    "Dashboard": ("Pages.Dashboard", "render_dashboard"),
+    "Future Work": ("Pages.Future_Work", "render_future_work"),
 }
 
 # --- Render the Selected Page in the Main Column ---
 with main_col:
     st.markdown('<div class="main-content">', unsafe_allow_html=True)
-    page_renderer[st.session_state.page]()
+    with span("app.page_import"):
+        render_page = load_page_renderer(*page_renderer[st.session_state.page])
+    with span(f"app.render {st.session_state.page}"):
+        render_page()
+    render_profile_panel()
     st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file